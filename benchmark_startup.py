@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Amazon Japan Scraper v5.0 - Startup Benchmark
+Measures time to first window (and optionally time to first search page)
+and fails when a threshold is exceeded, to guard startup against regressions.
+
+Usage:
+    python benchmark_startup.py                                  # run from source
+    python benchmark_startup.py --exe release_v5/Amazon_Japan_Scraper_v5.0_Selenium.exe
+    python benchmark_startup.py --first-page iPhone              # also time the first search page
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure_first_window(cmd, timeout):
+    """Launch the app once; return (seconds to first window, heavy modules loaded)"""
+    fd, marker = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    os.remove(marker)
+    env = dict(os.environ, AJS_STARTUP_BENCH=marker)
+
+    start = time.time()
+    proc = subprocess.Popen(cmd, cwd=HERE, env=env)
+    try:
+        while not os.path.exists(marker):
+            if proc.poll() is not None and not os.path.exists(marker):
+                raise RuntimeError(f'app exited with code {proc.returncode} before showing a window')
+            if time.time() - start > timeout:
+                raise RuntimeError(f'no window after {timeout}s')
+            time.sleep(0.05)
+        with open(marker, encoding='utf-8') as f:
+            report = json.load(f)
+        proc.wait(timeout=30)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        if os.path.exists(marker):
+            os.remove(marker)
+
+    return report['first_window_at'] - start, report['heavy_modules']
+
+
+def measure_first_page(keyword):
+    """Return seconds from search start to the first parsed search results page"""
+    sys.path.insert(0, HERE)
+    from main_selenium_only import SeleniumOnlyScraper, load_selenium
+
+    start = time.time()
+    if not load_selenium():
+        raise RuntimeError('Selenium is not installed')
+    scraper = SeleniumOnlyScraper()
+    driver = scraper._create_driver()
+    try:
+        products = scraper._search_page(driver, keyword, 1)
+    finally:
+        driver.quit()
+    if not products:
+        raise RuntimeError('first search page returned no products')
+    return time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Startup benchmark')
+    parser.add_argument('--exe', help='benchmark a built executable instead of the source')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=120)
+    parser.add_argument('--max-first-window', type=float, default=5.0,
+                        help='fail if the median time to first window exceeds this (seconds)')
+    parser.add_argument('--first-page', metavar='KEYWORD',
+                        help='also measure time to first search page (needs Chrome and network)')
+    parser.add_argument('--max-first-page', type=float, default=60.0)
+    args = parser.parse_args()
+
+    if args.exe:
+        cmd = [os.path.abspath(args.exe)]
+    else:
+        cmd = [sys.executable, os.path.join(HERE, 'main_selenium_only.py')]
+
+    print('='*70)
+    print('Amazon Japan Scraper v5.0 - Startup Benchmark')
+    print('='*70)
+    print(' '.join(cmd))
+    print()
+
+    failed = False
+    timings = []
+    for run in range(1, args.runs + 1):
+        elapsed, heavy = measure_first_window(cmd, args.timeout)
+        timings.append(elapsed)
+        print(f'Run {run}: first window in {elapsed:.2f}s')
+        if heavy:
+            print(f'ERROR: heavy modules imported before first window: {", ".join(heavy)}')
+            failed = True
+
+    median = statistics.median(timings)
+    print(f'\nTime to first window (median of {args.runs}): {median:.2f}s '
+          f'(limit {args.max_first_window:.2f}s)')
+    if median > args.max_first_window:
+        print('ERROR: time to first window exceeds limit')
+        failed = True
+
+    if args.first_page:
+        elapsed = measure_first_page(args.first_page)
+        print(f'Time to first page: {elapsed:.2f}s (limit {args.max_first_page:.2f}s)')
+        if elapsed > args.max_first_page:
+            print('ERROR: time to first page exceeds limit')
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,13 +4,41 @@ Amazon Japan Scraper v5.0 - Build Script
 Build script for creating standalone executable using PyInstaller
 """
 
+import argparse
 import subprocess
 import sys
 import os
 import shutil
 import platform
 
+# Modules never used at runtime. Leaving them out keeps the bundle small,
+# which matters most for --onefile where the whole bundle is unpacked on every launch.
+EXCLUDED_MODULES = [
+    'lxml',              # BeautifulSoup uses html.parser
+    'matplotlib',
+    'scipy',
+    'IPython',
+    'jupyter',
+    'notebook',
+    'pytest',
+    'PIL',
+    'pyarrow',
+    'sqlalchemy',
+    'numexpr',
+    'bottleneck',
+    'xlsxwriter',
+    'pandas.tests',
+    'numpy.tests',
+    'tkinter.test',
+]
+
 def main():
+    parser = argparse.ArgumentParser(description='Build Amazon Japan Scraper v5.0')
+    parser.add_argument('--profile', choices=['onefile', 'onedir'], default='onefile',
+                        help='onefile: single exe (slower cold start, unpacks on every launch); '
+                             'onedir: folder with exe (fast start)')
+    args = parser.parse_args()
+    
     print('='*70)
     print('Amazon Japan Scraper v5.0 - Build Script')
     print('='*70)
@@ -21,7 +49,7 @@ def main():
         print('ERROR: main_selenium_only.py not found!')
         sys.exit(1)
     
-    print('Building Amazon Japan Scraper v5.0...')
+    print(f'Building Amazon Japan Scraper v5.0 ({args.profile})...')
     print()
     
     # Determine executable name based on platform
@@ -29,36 +57,23 @@ def main():
     exe_name = 'Amazon_Japan_Scraper_v5.0_Selenium'
     
     # PyInstaller command
+    # pandas/selenium are imported lazily inside functions; PyInstaller still
+    # follows those imports, so only dynamically loaded modules need hints.
     cmd = [
         'pyinstaller',
-        '--onefile',
+        f'--{args.profile}',
         '--windowed',
         f'--name={exe_name}',
-        '--hidden-import=selenium',
         '--hidden-import=undetected_chromedriver',
-        '--hidden-import=pandas',
-        '--hidden-import=openpyxl',
-        '--hidden-import=beautifulsoup4',
-        '--hidden-import=bs4',
-        '--hidden-import=lxml',
-        '--hidden-import=numpy',
-        '--hidden-import=requests',
-        '--hidden-import=urllib3',
-        '--hidden-import=certifi',
-        '--hidden-import=idna',
-        '--hidden-import=charset_normalizer',
-        '--hidden-import=soupsieve',
-        '--hidden-import=et_xmlfile',
-        '--hidden-import=dateutil',
-        '--hidden-import=pytz',
-        '--hidden-import=six',
-        '--hidden-import=tkinter',
+        '--hidden-import=openpyxl',       # loaded by pandas via engine='openpyxl'
         '--hidden-import=tkinter.ttk',
+        '--noupx',                        # UPX-compressed binaries are slower to load
         '--icon=NONE',
         '--noconfirm',
         '--clean',
-        'main_selenium_only.py'
     ]
+    cmd += [f'--exclude-module={name}' for name in EXCLUDED_MODULES]
+    cmd.append('main_selenium_only.py')
     
     print('PyInstaller command:')
     print(' '.join(cmd))
@@ -86,19 +101,27 @@ def main():
     
     print(f'\nCreating release directory: {release_dir}/')
     
-    # Copy executable
+    # Copy executable (onedir: copy the whole application folder)
     dist_dir = 'dist'
     if is_windows:
         exe_file = f'{exe_name}.exe'
     else:
         exe_file = exe_name
     
-    src_path = os.path.join(dist_dir, exe_file)
-    dst_path = os.path.join(release_dir, exe_file)
+    if args.profile == 'onedir':
+        src_path = os.path.join(dist_dir, exe_name, exe_file)
+        dst_path = os.path.join(release_dir, exe_name, exe_file)
+    else:
+        src_path = os.path.join(dist_dir, exe_file)
+        dst_path = os.path.join(release_dir, exe_file)
     
     if os.path.exists(src_path):
-        shutil.copy2(src_path, dst_path)
-        print(f'Copied: {exe_file}')
+        if args.profile == 'onedir':
+            shutil.copytree(os.path.join(dist_dir, exe_name), os.path.join(release_dir, exe_name))
+            print(f'Copied: {exe_name}/')
+        else:
+            shutil.copy2(src_path, dst_path)
+            print(f'Copied: {exe_file}')
         
         # Verify file size
         size_kb = os.path.getsize(dst_path) / 1024
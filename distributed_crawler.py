@@ -0,0 +1,610 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Amazon Japan 卖家信息提取工具 - 分布式抓取 (协调者/工作节点)
+
+协调者把 关键词/页码 拆分成搜索任务写入共享队列，工作节点领取任务
+（带可见性超时的租约），用 SeleniumOnlyScraper 执行现有的提取逻辑，
+搜索任务产生的 ASIN 任务再回到队列，最终由 merge 合并导出Excel。
+
+队列后端:
+    sqlite:///amazon_data/jobs.db   单机多进程
+    redis://host:6379/0             多机（需要 pip install redis）
+
+用法:
+    python distributed_crawler.py coordinator --queue redis://host:6379/0 --job lipstick --keyword 口红 --pages 10
+    python distributed_crawler.py worker --queue redis://host:6379/0 --job lipstick
+    python distributed_crawler.py status --queue redis://host:6379/0 --job lipstick
+    python distributed_crawler.py merge --queue redis://host:6379/0 --job lipstick
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import sqlite3
+import sys
+import time
+import uuid
+
+try:
+    import redis
+    REDIS_OK = True
+except:
+    REDIS_OK = False
+
+
+DEFAULT_VISIBILITY_TIMEOUT = 300
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+def _task_key(task):
+    """任务去重键 - 同一页/同一ASIN只入队一次"""
+    if task['type'] == 'search':
+        return f"search:{task['keyword']}:{task['page']}"
+    return f"asin:{task['product']['asin']}"
+
+
+class SQLiteTaskQueue:
+    """SQLite任务队列 - 单机多进程共享"""
+
+    def __init__(self, path, job, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.job = job
+        self.max_attempts = max_attempts
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job TEXT NOT NULL,
+                task_key TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_until REAL NOT NULL DEFAULT 0,
+                worker TEXT,
+                lease_token TEXT,
+                error TEXT,
+                UNIQUE (job, task_key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (job, status, lease_until);
+            CREATE TABLE IF NOT EXISTS results (
+                job TEXT NOT NULL,
+                asin TEXT NOT NULL,
+                rank TEXT NOT NULL,
+                product TEXT NOT NULL,
+                seller TEXT,
+                PRIMARY KEY (job, asin)
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                job TEXT PRIMARY KEY,
+                config TEXT NOT NULL
+            );
+        ''')
+        # 旧版本创建的数据库没有租约令牌列
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(tasks)')]
+        if 'lease_token' not in columns:
+            self.conn.execute('ALTER TABLE tasks ADD COLUMN lease_token TEXT')
+
+    def set_config(self, config):
+        self.conn.execute('INSERT OR REPLACE INTO meta (job, config) VALUES (?, ?)',
+                          (self.job, json.dumps(config, ensure_ascii=False)))
+
+    def get_config(self):
+        row = self.conn.execute('SELECT config FROM meta WHERE job = ?', (self.job,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def put(self, tasks, limit=None):
+        """入队（按去重键忽略重复），limit限制该类型任务总数，返回新入队数量"""
+        added = 0
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            for task in tasks:
+                if limit is not None:
+                    count = self.conn.execute(
+                        "SELECT COUNT(*) FROM tasks WHERE job = ? AND task_key LIKE ?",
+                        (self.job, f"{task['type']}:%")).fetchone()[0]
+                    if count >= limit:
+                        break
+                cursor = self.conn.execute(
+                    'INSERT OR IGNORE INTO tasks (job, task_key, payload) VALUES (?, ?, ?)',
+                    (self.job, _task_key(task), json.dumps(task, ensure_ascii=False)))
+                added += cursor.rowcount
+            self.conn.execute('COMMIT')
+        except:
+            self.conn.execute('ROLLBACK')
+            raise
+        return added
+
+    def lease(self, worker_id, visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT):
+        """领取一个待处理或租约已过期的任务，返回 (task_id, task, token, attempt) 或 None
+        
+        租约过期说明工作节点崩溃或超时，同样计入尝试次数；次数用尽的任务标记为 failed。
+        token 为本次租约的令牌，complete/fail/extend/release 只对持有当前租约的节点生效。
+        """
+        token = uuid.uuid4().hex
+        now = time.time()
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            self.conn.execute(
+                "UPDATE tasks SET status = 'failed', error = 'lease expired' WHERE job = ? AND "
+                "status = 'leased' AND lease_until < ? AND attempts >= ?",
+                (self.job, now, self.max_attempts))
+            row = self.conn.execute(
+                "SELECT id, payload, attempts FROM tasks WHERE job = ? AND attempts < ? AND "
+                "(status = 'pending' OR (status = 'leased' AND lease_until < ?)) "
+                "ORDER BY id LIMIT 1", (self.job, self.max_attempts, now)).fetchone()
+            if row:
+                self.conn.execute(
+                    "UPDATE tasks SET status = 'leased', lease_until = ?, worker = ?, lease_token = ?, "
+                    "attempts = attempts + 1 WHERE id = ?",
+                    (now + visibility_timeout, worker_id, token, row[0]))
+            self.conn.execute('COMMIT')
+        except:
+            self.conn.execute('ROLLBACK')
+            raise
+        if not row:
+            return None
+        return row[0], json.loads(row[1]), token, row[2] + 1
+
+    def _update_lease(self, sql, params, task_id, token):
+        """仅当租约仍属于 token 时执行更新，返回是否生效"""
+        cursor = self.conn.execute(
+            sql + " WHERE id = ? AND lease_token = ? AND status = 'leased'",
+            tuple(params) + (task_id, token))
+        return cursor.rowcount > 0
+
+    def complete(self, task_id, token):
+        return self._update_lease("UPDATE tasks SET status = 'done', error = NULL", (), task_id, token)
+
+    def fail(self, task_id, token, error):
+        """任务失败 - 未超过最大次数则重新入队"""
+        return self._update_lease(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "lease_until = 0, error = ?", (self.max_attempts, str(error)[:500]), task_id, token)
+
+    def extend(self, task_id, token, visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT):
+        """续租 - 任务耗时超过可见性超时（熔断暂停、重试）时由工作节点定期调用"""
+        return self._update_lease("UPDATE tasks SET lease_until = ?", (time.time() + visibility_timeout,),
+                                  task_id, token)
+
+    def release(self, task_id, token):
+        """归还未完成的任务（节点停止时），不计入尝试次数"""
+        return self._update_lease(
+            "UPDATE tasks SET status = 'pending', lease_until = 0, attempts = attempts - 1",
+            (), task_id, token)
+
+    def add_result(self, product, seller, rank):
+        self.conn.execute(
+            'INSERT OR REPLACE INTO results (job, asin, rank, product, seller) VALUES (?, ?, ?, ?, ?)',
+            (self.job, product['asin'], rank, json.dumps(product, ensure_ascii=False),
+             json.dumps(seller, ensure_ascii=False) if seller else None))
+
+    def results(self):
+        """返回 [(rank, product, seller)]，按搜索结果顺序排序"""
+        rows = self.conn.execute(
+            'SELECT rank, product, seller FROM results WHERE job = ? ORDER BY rank', (self.job,))
+        return [(rank, json.loads(product), json.loads(seller) if seller else None)
+                for rank, product, seller in rows]
+
+    def stats(self):
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        rows = self.conn.execute(
+            'SELECT status, COUNT(*) FROM tasks WHERE job = ? GROUP BY status', (self.job,))
+        for status, count in rows:
+            counts[status] = count
+        counts['results'] = self.conn.execute(
+            'SELECT COUNT(*) FROM results WHERE job = ?', (self.job,)).fetchone()[0]
+        return counts
+
+    def is_drained(self):
+        stats = self.stats()
+        return stats['pending'] == 0 and stats['leased'] == 0
+
+
+class RedisTaskQueue:
+    """Redis任务队列 - 多机共享
+
+    入队、领取、失败均由 Lua 脚本原子完成，节点在任意步骤崩溃都不会丢任务。
+    client 可传入任意兼容 redis-py 接口的客户端（例如 fakeredis）。
+    """
+
+    # KEYS: seen, tasks, pending  ARGV: task_key, task_id, payload, limit('' 为不限)
+    # 返回 1 入队，0 重复，-1 已达上限
+    PUT_SCRIPT = """
+        if ARGV[4] ~= '' and redis.call('SCARD', KEYS[1]) >= tonumber(ARGV[4]) then
+            return -1
+        end
+        if redis.call('SADD', KEYS[1], ARGV[1]) == 0 then
+            return 0
+        end
+        redis.call('HSET', KEYS[2], ARGV[2], ARGV[3])
+        redis.call('LPUSH', KEYS[3], ARGV[2])
+        return 1
+    """
+
+    # KEYS: leases, pending, attempts, errors, failed, workers, tasks, tokens
+    # ARGV: now, lease_until, max_attempts, worker_id, token
+    # 先回收过期租约（次数用尽的标记失败），再领取一个任务，返回 {id, payload, attempt}
+    LEASE_SCRIPT = """
+        local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+        for _, id in ipairs(expired) do
+            redis.call('ZREM', KEYS[1], id)
+            if tonumber(redis.call('HGET', KEYS[3], id) or '0') >= tonumber(ARGV[3]) then
+                redis.call('HSET', KEYS[4], id, 'lease expired')
+                redis.call('SADD', KEYS[5], id)
+            else
+                redis.call('RPUSH', KEYS[2], id)
+            end
+        end
+        local id = redis.call('RPOP', KEYS[2])
+        if not id then
+            return nil
+        end
+        redis.call('ZADD', KEYS[1], ARGV[2], id)
+        local attempt = redis.call('HINCRBY', KEYS[3], id, 1)
+        redis.call('HSET', KEYS[6], id, ARGV[4])
+        redis.call('HSET', KEYS[8], id, ARGV[5])
+        return {id, redis.call('HGET', KEYS[7], id), attempt}
+    """
+
+    # 以下脚本只在租约仍属于 token 时生效（租约过期被回收或已被其他节点领取时返回0）
+    # KEYS[1], KEYS[2] 固定为 leases, tokens  ARGV[1], ARGV[2] 固定为 task_id, token
+    OWNED = """
+        if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] or not redis.call('ZSCORE', KEYS[1], ARGV[1]) then
+            return 0
+        end
+    """
+
+    # KEYS: leases, tokens, done, errors
+    COMPLETE_SCRIPT = OWNED + """
+        redis.call('ZREM', KEYS[1], ARGV[1])
+        redis.call('SADD', KEYS[3], ARGV[1])
+        redis.call('HDEL', KEYS[4], ARGV[1])
+        return 1
+    """
+
+    # KEYS: leases, tokens, errors, attempts, failed, pending  ARGV: task_id, token, error, max_attempts
+    FAIL_SCRIPT = OWNED + """
+        redis.call('ZREM', KEYS[1], ARGV[1])
+        redis.call('HSET', KEYS[3], ARGV[1], ARGV[3])
+        if tonumber(redis.call('HGET', KEYS[4], ARGV[1]) or '0') >= tonumber(ARGV[4]) then
+            redis.call('SADD', KEYS[5], ARGV[1])
+        else
+            redis.call('LPUSH', KEYS[6], ARGV[1])
+        end
+        return 1
+    """
+
+    # KEYS: leases, tokens  ARGV: task_id, token, lease_until
+    EXTEND_SCRIPT = OWNED + """
+        redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+        return 1
+    """
+
+    # KEYS: leases, tokens, attempts, pending  ARGV: task_id, token
+    # 放回队尾（下一个被领取），不计入尝试次数
+    RELEASE_SCRIPT = OWNED + """
+        redis.call('ZREM', KEYS[1], ARGV[1])
+        redis.call('HINCRBY', KEYS[3], ARGV[1], -1)
+        redis.call('RPUSH', KEYS[4], ARGV[1])
+        return 1
+    """
+
+    def __init__(self, url=None, job='default', max_attempts=DEFAULT_MAX_ATTEMPTS, client=None):
+        if client is None:
+            if not REDIS_OK:
+                raise RuntimeError("redis未安装，请运行: pip install redis")
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self.r = client
+        self.job = job
+        self.max_attempts = max_attempts
+        self.prefix = f"ajs:{job}:"
+        self._put = self.r.register_script(self.PUT_SCRIPT)
+        self._lease = self.r.register_script(self.LEASE_SCRIPT)
+        self._complete = self.r.register_script(self.COMPLETE_SCRIPT)
+        self._fail = self.r.register_script(self.FAIL_SCRIPT)
+        self._extend = self.r.register_script(self.EXTEND_SCRIPT)
+        self._release = self.r.register_script(self.RELEASE_SCRIPT)
+
+    def _k(self, name):
+        return self.prefix + name
+
+    def set_config(self, config):
+        self.r.set(self._k('config'), json.dumps(config, ensure_ascii=False))
+
+    def get_config(self):
+        raw = self.r.get(self._k('config'))
+        return json.loads(raw) if raw else {}
+
+    def put(self, tasks, limit=None):
+        """入队（按去重键忽略重复），limit限制该类型任务总数，返回新入队数量"""
+        added = 0
+        for task in tasks:
+            result = self._put(
+                keys=[self._k(f"seen:{task['type']}"), self._k('tasks'), self._k('pending')],
+                args=[_task_key(task), uuid.uuid4().hex, json.dumps(task, ensure_ascii=False),
+                      '' if limit is None else limit])
+            if result == -1:
+                break
+            added += result
+        return added
+
+    def lease(self, worker_id, visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT):
+        """领取一个任务（同时回收过期租约），返回 (task_id, task, token, attempt) 或 None"""
+        now = time.time()
+        token = uuid.uuid4().hex
+        leased = self._lease(
+            keys=[self._k('leases'), self._k('pending'), self._k('attempts'), self._k('errors'),
+                  self._k('failed'), self._k('workers'), self._k('tasks'), self._k('tokens')],
+            args=[now, now + visibility_timeout, self.max_attempts, worker_id, token])
+        if not leased:
+            return None
+        task_id, payload, attempt = leased
+        return task_id, json.loads(payload), token, int(attempt)
+
+    def complete(self, task_id, token):
+        return self._complete(
+            keys=[self._k('leases'), self._k('tokens'), self._k('done'), self._k('errors')],
+            args=[task_id, token]) == 1
+
+    def fail(self, task_id, token, error):
+        """任务失败 - 未超过最大次数则重新入队"""
+        return self._fail(
+            keys=[self._k('leases'), self._k('tokens'), self._k('errors'), self._k('attempts'),
+                  self._k('failed'), self._k('pending')],
+            args=[task_id, token, str(error)[:500], self.max_attempts]) == 1
+
+    def extend(self, task_id, token, visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT):
+        """续租 - 任务耗时超过可见性超时（熔断暂停、重试）时由工作节点定期调用"""
+        return self._extend(
+            keys=[self._k('leases'), self._k('tokens')],
+            args=[task_id, token, time.time() + visibility_timeout]) == 1
+
+    def release(self, task_id, token):
+        """归还未完成的任务（节点停止时），不计入尝试次数"""
+        return self._release(
+            keys=[self._k('leases'), self._k('tokens'), self._k('attempts'), self._k('pending')],
+            args=[task_id, token]) == 1
+
+    def add_result(self, product, seller, rank):
+        self.r.hset(self._k('results'), product['asin'], json.dumps(
+            {'rank': rank, 'product': product, 'seller': seller}, ensure_ascii=False))
+
+    def results(self):
+        rows = [json.loads(raw) for raw in self.r.hvals(self._k('results'))]
+        rows.sort(key=lambda row: row['rank'])
+        return [(row['rank'], row['product'], row['seller']) for row in rows]
+
+    def stats(self):
+        return {
+            'pending': self.r.llen(self._k('pending')),
+            'leased': self.r.zcard(self._k('leases')),
+            'done': self.r.scard(self._k('done')),
+            'failed': self.r.scard(self._k('failed')),
+            'results': self.r.hlen(self._k('results')),
+        }
+
+    def is_drained(self):
+        return self.r.llen(self._k('pending')) == 0 and self.r.zcard(self._k('leases')) == 0
+
+
+def open_queue(url, job):
+    """根据URL打开队列: sqlite:///path.db 或 redis://host:port/db"""
+    if url.startswith('sqlite:///'):
+        return SQLiteTaskQueue(url[len('sqlite:///'):], job)
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisTaskQueue(url, job)
+    raise ValueError(f"不支持的队列地址: {url}")
+
+
+def _rank(page, index):
+    """排序键 - 合并时保持搜索结果顺序"""
+    return f"{page:04d}:{index:03d}"
+
+
+class Coordinator:
+    """协调者 - 拆分搜索任务并合并结果"""
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def submit(self, keyword, max_pages=5, max_products=100):
+        self.queue.set_config({'keyword': keyword, 'max_pages': max_pages,
+                               'max_products': max_products})
+        tasks = [{'type': 'search', 'keyword': keyword, 'page': page}
+                 for page in range(1, max_pages + 1)]
+        return self.queue.put(tasks)
+
+    def merge(self, scraper):
+        """合并所有节点的结果并导出Excel"""
+        products = []
+        sellers = []
+        for _, product, seller in self.queue.results():
+            products.append(product)
+            if seller:
+                sellers.append(seller)
+        if not products:
+            return None, 0, 0
+        return scraper._save_to_excel(products, sellers), len(products), len(sellers)
+
+
+class Worker:
+    """工作节点 - 领取任务、执行现有提取逻辑、回写结果
+    
+    处理任务期间每隔 visibility_timeout/3 续租一次（熔断暂停、重试都会超过单次超时），
+    租约被其他节点接管后放弃当前任务。
+    """
+
+    def __init__(self, queue, scraper, worker_id=None,
+                 visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT, progress_callback=None):
+        self.queue = queue
+        self.scraper = scraper
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.visibility_timeout = visibility_timeout
+        self.progress_callback = progress_callback or print
+        self.driver = None
+        self.running = True
+        # 当前租约 {'id', 'token', 'renewed_at', 'lost'}
+        self.lease = None
+
+    def _log(self, message):
+        self.progress_callback(f"[{self.worker_id}] {message}")
+
+    def _ensure_driver(self):
+        if self.driver is None:
+            self._log("🚀 启动无头浏览器...")
+            self.driver = self.scraper._create_driver()
+        return self.driver
+
+    def _reset_driver(self):
+        if self.driver:
+            try:
+                self.driver.quit()
+            except:
+                pass
+        self.driver = None
+
+    def _keep_going(self):
+        """停止标志 - 抓取过程中频繁调用，顺带续租；节点停止或租约失效时返回False"""
+        if not self.running:
+            return False
+        lease = self.lease
+        if lease is None:
+            return True
+        if not lease['lost'] and time.time() - lease['renewed_at'] >= self.visibility_timeout / 3:
+            if self.queue.extend(lease['id'], lease['token'], self.visibility_timeout):
+                lease['renewed_at'] = time.time()
+            else:
+                lease['lost'] = True
+                self._log("⚠️ 租约已失效（任务已被其他节点领取），放弃当前任务")
+        return not lease['lost']
+
+    def run(self, wait=False, poll_interval=5):
+        """循环处理任务；队列清空后退出（wait=True时持续等待新任务）"""
+        processed = 0
+        try:
+            while self.running:
+                leased = self.queue.lease(self.worker_id, self.visibility_timeout)
+                if leased is None:
+                    if not wait and self.queue.is_drained():
+                        break
+                    time.sleep(poll_interval)
+                    continue
+                task_id, task, token, attempt = leased
+                self.lease = {'id': task_id, 'token': token, 'renewed_at': time.time(), 'lost': False}
+                try:
+                    finished = self._handle(task, self._keep_going, attempt >= self.queue.max_attempts)
+                    if not finished:
+                        self.queue.release(task_id, token)
+                    elif self.queue.complete(task_id, token):
+                        processed += 1
+                    else:
+                        self._log("⚠️ 租约已失效，结果已写入但任务由其他节点继续处理")
+                except Exception as e:
+                    self._log(f"⚠️ 任务失败: {e}")
+                    self.queue.fail(task_id, token, e)
+                    # 浏览器异常后重建
+                    self._reset_driver()
+                self.lease = None
+        except KeyboardInterrupt:
+            self._log("⏹️ 正在停止...")
+        finally:
+            # 被中断时归还正在处理的任务
+            if self.lease:
+                self.queue.release(self.lease['id'], self.lease['token'])
+                self.lease = None
+            self._reset_driver()
+            self._log(self.scraper._format_fetch_stats())
+            if self.scraper.profiler.fields:
+                self._log(f"📈 提取命中率: {self.scraper.profiler.format_summary()}")
+            self._log(f"✅ 完成任务: {processed}")
+        return processed
+
+    def _handle(self, task, stop_flag, last_attempt=False):
+        """执行一个任务，完成返回True，因停止或租约失效而中断返回False
+        
+        页面加载失败、卖家信息获取失败时抛出异常，由队列重试；
+        ASIN任务最后一次尝试仍失败时保留产品行（卖家为空）。
+        """
+        driver = self._ensure_driver()
+        if task['type'] == 'search':
+            page = task['page']
+            self._log(f"🔍 搜索 {task['keyword']} 第 {page} 页...")
+            products = self.scraper._search_page(driver, task['keyword'], page,
+                                                 self._log, stop_flag)
+            if products is None:
+                if not stop_flag():
+                    return False
+                raise RuntimeError(f"第{page}页加载失败")
+            config = self.queue.get_config()
+            added = self.queue.put(
+                [{'type': 'asin', 'product': product, 'rank': _rank(page, index)}
+                 for index, product in enumerate(products)],
+                limit=config.get('max_products'))
+            self._log(f"📦 第{page}页新增 {added} 个ASIN任务")
+            time.sleep(random.uniform(2, 3))
+        else:
+            product = task['product']
+            self._log(f"📋 {product['asin']} {product['title'][:30]}...")
+            seller = self.scraper._get_seller_with_browser(driver, product, self._log, stop_flag)
+            if seller is None:
+                if not stop_flag():
+                    return False
+                if not last_attempt:
+                    raise RuntimeError(f"{product['asin']} 卖家信息获取失败")
+                self._log(f"⚠️ {product['asin']} 重试次数已用尽，保留产品但卖家为空")
+            self.queue.add_result(product, seller, task['rank'])
+            time.sleep(random.uniform(0.5, 1.0))
+        return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Amazon Japan 分布式抓取")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    for name in ('coordinator', 'worker', 'status', 'merge'):
+        p = sub.add_parser(name)
+        p.add_argument('--queue', default='sqlite:///amazon_data/jobs.db',
+                       help="sqlite:///path.db 或 redis://host:port/db")
+        p.add_argument('--job', required=True, help="任务名（同一队列可运行多个任务）")
+        if name == 'coordinator':
+            p.add_argument('--keyword', required=True)
+            p.add_argument('--pages', type=int, default=5)
+            p.add_argument('--max-products', type=int, default=100)
+        elif name == 'worker':
+            p.add_argument('--worker-id')
+            p.add_argument('--visibility-timeout', type=int, default=DEFAULT_VISIBILITY_TIMEOUT)
+            p.add_argument('--wait', action='store_true', help="队列清空后继续等待新任务")
+
+    args = parser.parse_args(argv)
+    queue = open_queue(args.queue, args.job)
+
+    if args.command == 'coordinator':
+        added = Coordinator(queue).submit(args.keyword, args.pages, args.max_products)
+        print(f"✅ 已提交 {added} 个搜索任务")
+    elif args.command == 'status':
+        print(json.dumps(queue.stats(), ensure_ascii=False))
+    else:
+        from main_selenium_only import SeleniumOnlyScraper, load_selenium
+        scraper = SeleniumOnlyScraper()
+        if args.command == 'merge':
+            filename, products, sellers = Coordinator(queue).merge(scraper)
+            if filename:
+                print(f"💾 已保存到: {filename}")
+                print(f"✅ 完成！产品:{products}, 卖家:{sellers}")
+            else:
+                print("❌ 未获取到任何产品")
+        else:
+            if not load_selenium():
+                print("❌ Selenium未安装，请运行: pip install selenium undetected-chromedriver")
+                return 1
+            Worker(queue, scraper, args.worker_id, args.visibility_timeout).run(wait=args.wait)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Amazon Japan 卖家信息提取工具 - 提取命中率分析
+
+记录每个字段由哪个选择器/正则命中、每次尝试的耗时以及回退深度，
+按单次运行或按回放语料（保存下来的HTML页面）汇总，
+用于删除从不命中的规则、把高频规则排到前面。
+
+用法:
+    python extraction_profiler.py replay amazon_data/corpus        # 回放语料
+    python extraction_profiler.py merge amazon_data/extraction_profile_*.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import threading
+
+
+# 字段显示顺序
+FIELD_LABELS = {
+    'seller_name': '卖家',
+    'business_name': '公司名',
+    'address': '地址',
+    'phone': '电话',
+    'email': '邮箱',
+    'fax': '传真',
+    'representative': '代表',
+    'store_name': '店铺名',
+}
+
+
+class ExtractionProfiler:
+    """字段提取统计 - 线程安全，可合并"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # field -> {'samples', 'hits', 'depths': {depth: count}}
+        self.fields = {}
+        # field -> {label: {'depth', 'tries', 'hits', 'seconds'}}
+        self.selectors = {}
+
+    def attempt(self, field, label, depth, seconds, hit):
+        """记录一次选择器/正则尝试"""
+        with self._lock:
+            stats = self.selectors.setdefault(field, {}).setdefault(
+                label, {'depth': depth, 'tries': 0, 'hits': 0, 'seconds': 0.0})
+            stats['tries'] += 1
+            stats['seconds'] += seconds
+            if hit:
+                stats['hits'] += 1
+
+    def record(self, field, depth):
+        """记录字段最终结果，depth 为命中的候选序号，未命中为 None"""
+        with self._lock:
+            stats = self.fields.setdefault(field, {'samples': 0, 'hits': 0, 'depths': {}})
+            stats['samples'] += 1
+            if depth is not None:
+                stats['hits'] += 1
+                key = str(depth)
+                stats['depths'][key] = stats['depths'].get(key, 0) + 1
+
+    def merge(self, report):
+        """合并另一份报告（report() 的输出）"""
+        with self._lock:
+            for field, other in report['fields'].items():
+                stats = self.fields.setdefault(field, {'samples': 0, 'hits': 0, 'depths': {}})
+                stats['samples'] += other['samples']
+                stats['hits'] += other['hits']
+                for depth, count in other['depths'].items():
+                    stats['depths'][depth] = stats['depths'].get(depth, 0) + count
+            for field, labels in report['selectors'].items():
+                for label, other in labels.items():
+                    stats = self.selectors.setdefault(field, {}).setdefault(
+                        label, {'depth': other['depth'], 'tries': 0, 'hits': 0, 'seconds': 0.0})
+                    stats['tries'] += other['tries']
+                    stats['hits'] += other['hits']
+                    stats['seconds'] += other['seconds']
+
+    def report(self):
+        with self._lock:
+            return json.loads(json.dumps({'fields': self.fields, 'selectors': self.selectors}))
+
+    def hit_rates(self):
+        """{field: 命中率}"""
+        with self._lock:
+            return {field: stats['hits'] / stats['samples']
+                    for field, stats in self.fields.items() if stats['samples']}
+
+    def format_summary(self):
+        """一行摘要，例如: 卖家 93% | 地址 73% | 电话 20%"""
+        rates = self.hit_rates()
+        parts = [f"{FIELD_LABELS.get(field, field)} {rates[field]:.0%}"
+                 for field in _ordered(rates)]
+        return ' | '.join(parts)
+
+    def format_report(self):
+        """完整报告 - 每个字段的命中率及各规则的命中数、耗时，标出从不命中的规则"""
+        report = self.report()
+        lines = []
+        for field in _ordered(report['fields']):
+            stats = report['fields'][field]
+            rate = stats['hits'] / stats['samples'] if stats['samples'] else 0
+            lines.append(f"{FIELD_LABELS.get(field, field)} ({field}): "
+                         f"{stats['hits']}/{stats['samples']} = {rate:.0%}")
+            labels = report['selectors'].get(field, {})
+            for label, sel in sorted(labels.items(), key=lambda item: item[1]['depth']):
+                avg_ms = sel['seconds'] / sel['tries'] * 1000 if sel['tries'] else 0
+                share = sel['hits'] / stats['hits'] if stats['hits'] else 0
+                flag = '  ⚠️ 从未命中' if not sel['hits'] else ''
+                lines.append(f"  [{sel['depth']}] 命中 {sel['hits']:>4} ({share:>4.0%})  "
+                             f"尝试 {sel['tries']:>4}  平均 {avg_ms:6.2f}ms  {label}{flag}")
+        return '\n'.join(lines)
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        return path
+
+
+def _ordered(fields):
+    known = [field for field in FIELD_LABELS if field in fields]
+    return known + sorted(field for field in fields if field not in FIELD_LABELS)
+
+
+def replay(corpus_directory, scraper=None):
+    """对语料目录中保存的产品页/卖家页重新运行提取逻辑，返回 ExtractionProfiler"""
+    from bs4 import BeautifulSoup
+    from main_selenium_only import SeleniumOnlyScraper
+
+    scraper = scraper or SeleniumOnlyScraper()
+    scraper.profiler = ExtractionProfiler()
+    for path in sorted(glob.glob(os.path.join(corpus_directory, '*.html'))):
+        with open(path, encoding='utf-8') as f:
+            soup = BeautifulSoup(f.read(), 'html.parser')
+        page_type = os.path.basename(path).split('_', 1)[0]
+        if page_type == 'product':
+            scraper._parse_seller_from_product_page(soup)
+        elif page_type == 'seller':
+            scraper._parse_seller_details(soup.get_text())
+    return scraper.profiler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="提取命中率分析")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('replay', help="回放保存的HTML语料")
+    p.add_argument('corpus')
+    p.add_argument('--output', help="保存JSON报告")
+    p = sub.add_parser('merge', help="合并多次运行的JSON报告")
+    p.add_argument('reports', nargs='+')
+    p.add_argument('--output', help="保存JSON报告")
+    args = parser.parse_args(argv)
+
+    if args.command == 'replay':
+        profiler = replay(args.corpus)
+    else:
+        profiler = ExtractionProfiler()
+        # Windows 命令行不展开通配符
+        paths = [path for pattern in args.reports for path in (glob.glob(pattern) or [pattern])]
+        for path in paths:
+            with open(path, encoding='utf-8') as f:
+                profiler.merge(json.load(f))
+
+    print(profiler.format_report())
+    if args.output:
+        profiler.save(args.output)
+        print(f"💾 已保存到: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,23 +8,270 @@ Amazon Japan 卖家信息提取工具 - 纯Selenium版 v5.0
 import tkinter as tk
 from tkinter import ttk, messagebox
 from bs4 import BeautifulSoup
-import pandas as pd
 import time
 import random
 import re
 import threading
+import queue
 import os
+import sys
+import json
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlencode, unquote
 
-try:
-    import undetected_chromedriver as uc
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    SELENIUM_OK = True
-except:
-    SELENIUM_OK = False
+from extraction_profiler import ExtractionProfiler
+
+# Selenium / undetected_chromedriver 在开始搜索时才导入，pandas 在导出时才导入，加快启动
+uc = By = WebDriverWait = TimeoutException = None
+SELENIUM_OK = None  # None 表示尚未尝试导入
+
+_selenium_lock = threading.Lock()
+
+
+def load_selenium():
+    """按需导入Selenium，返回是否可用"""
+    global uc, By, WebDriverWait, TimeoutException, SELENIUM_OK
+    with _selenium_lock:
+        if SELENIUM_OK is None:
+            try:
+                import undetected_chromedriver as uc
+                from selenium.webdriver.common.by import By
+                from selenium.webdriver.support.ui import WebDriverWait
+                from selenium.common.exceptions import TimeoutException
+                SELENIUM_OK = True
+            except:
+                SELENIUM_OK = False
+        return SELENIUM_OK
+
+
+# 各类页面加载成功的标志元素
+PAGE_READY_SELECTORS = {
+    'search': 'div[data-component-type="s-search-result"]',
+    'product': '#merchant-info, #buybox, #tabular-buybox, #availability',
+    'seller': '#page-section-detail-seller-info, #seller-profile-container, #sellerName, #seller-name',
+}
+PAGE_WAIT_TIMEOUTS = {'search': 15, 'product': 10, 'seller': 10}
+# 正常加载但没有内容的页面（无搜索结果/超出末页），视为终止状态，不重试
+PAGE_EMPTY_MARKERS = {
+    'search': (
+        '検索に一致する商品はありませんでした',
+        'に一致する商品はありませんでした',
+        'No results for',
+        'did not match any products',
+    ),
+}
+# 标志元素出现后再等待渲染的秒数
+PAGE_SETTLE_DELAYS = {'search': 0, 'product': 1, 'seller': 2}
+
+# 验证码/机器人检查页面
+CAPTCHA_SELECTOR = 'form[action*="validateCaptcha"], #captchacharacters'
+CAPTCHA_MARKERS = (
+    '/errors/validateCaptcha',
+    'captchacharacters',
+    'Type the characters you see in this image',
+    "Sorry, we just need to make sure you're not a robot",
+    '表示されている文字を入力してください',
+    '申し訳ありませんが、お客様がロボットでないことを確認させていただく必要があります',
+)
+
+
+def is_captcha_page(html):
+    """判断页面是否为验证码/机器人检查页"""
+    return any(marker in html for marker in CAPTCHA_MARKERS)
+
+
+class CircuitBreaker:
+    """熔断器 - 封锁率超过阈值时暂停所有抓取线程"""
+
+    def __init__(self, threshold=0.5, window=20, min_samples=5, cooldown=60, max_cooldown=600):
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.trips = 0
+        self._outcomes = deque(maxlen=window)
+        self._consecutive_trips = 0
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, blocked):
+        """记录一次页面结果，触发熔断时返回暂停秒数，否则返回0"""
+        with self._lock:
+            self._outcomes.append(1 if blocked else 0)
+            if len(self._outcomes) < self.min_samples:
+                return 0
+            rate = sum(self._outcomes) / len(self._outcomes)
+            if rate < self.threshold:
+                self._consecutive_trips = 0
+                return 0
+            if time.time() < self._open_until:
+                return 0
+            # 连续熔断时暂停时间翻倍
+            pause = min(self.cooldown * 2 ** self._consecutive_trips, self.max_cooldown)
+            self._consecutive_trips += 1
+            self.trips += 1
+            self._open_until = time.time() + pause
+            self._outcomes.clear()
+            return pause
+
+    def remaining(self):
+        with self._lock:
+            return max(0.0, self._open_until - time.time())
+
+    def wait(self, stop_flag=None):
+        """熔断期间阻塞，被停止时返回False"""
+        while True:
+            remaining = self.remaining()
+            if remaining <= 0:
+                return True
+            if stop_flag and not stop_flag():
+                return False
+            time.sleep(min(remaining, 1.0))
+
+
+class ShardPlanner:
+    """分片规划 - 结果超出搜索页数上限的分片，按 类目(rh=n:) → 价格区间(p_36) → 排序(s=)
+    依次细分，每个分片各自受页数上限限制，合计可覆盖更多商品。
+    页数上限以内能取完的分片不再细分。"""
+    
+    FACETS = ('category', 'price', 'sort')
+    FACET_LABELS = {'category': '类目', 'price': '价格', 'sort': '排序'}
+    # None 表示默认排序（相关度），即父分片本身
+    SORT_ORDERS = [None, 'price-asc-rank', 'price-desc-rank', 'review-rank']
+    # 页面上没有价格筛选链接时使用的区间（日元，None 表示不设上限）
+    PRICE_RANGES = [(None, 1000), (1000, 3000), (3000, 10000), (10000, None)]
+    
+    def __init__(self, sort_orders=None, price_ranges=None, max_categories=8):
+        self.sort_orders = sort_orders if sort_orders is not None else self.SORT_ORDERS
+        self.price_ranges = price_ranges if price_ranges is not None else self.PRICE_RANGES
+        self.max_categories = max_categories
+    
+    def root(self):
+        """未加任何筛选的初始分片"""
+        return {'label': '全部', 'params': {}, 'refinements': [], 'sort': None, 'depth': 0}
+    
+    def discover_categories(self, soup):
+        """从搜索结果的类目导航中提取全部 [(node_id, 类目名)]（折叠的"すべて表示"部分也在页面中）"""
+        categories = []
+        seen = set()
+        containers = soup.select('#departments, #s-refinements') or [soup]
+        for container in containers:
+            for link in container.select('a[href]'):
+                match = re.search(r'rh=n(?::|%3A)(\d+)', link['href'])
+                if not match:
+                    match = re.search(r'rh=n:(\d+)', unquote(link['href']))
+                if not match or match.group(1) in seen:
+                    continue
+                name = link.get_text(strip=True)
+                if not name:
+                    continue
+                seen.add(match.group(1))
+                categories.append((match.group(1), name))
+        return categories
+    
+    def discover_price_ranges(self, soup):
+        """从搜索结果的价格筛选链接中提取 [(p_36取值, 显示名)]，例如 ('1000-2500', '￥1,000～￥2,500')"""
+        ranges = []
+        seen = set()
+        containers = soup.select('#priceRefinements, #s-refinements') or [soup]
+        for container in containers:
+            for link in container.select('a[href]'):
+                match = re.search(r'p_36:(\d*-\d*)', unquote(link['href']))
+                if not match or match.group(1) in seen or match.group(1) == '-':
+                    continue
+                seen.add(match.group(1))
+                ranges.append((match.group(1), link.get_text(strip=True) or match.group(1)))
+        return ranges
+    
+    def covers_all_prices(self, ranges):
+        """价格区间是否首尾开放且相互衔接（子分片合起来覆盖全部价格）"""
+        bounds = sorted(((int(low or 0), int(high) if high else None)
+                         for low, high in (value.split('-') for value, _ in ranges)),
+                        key=lambda bound: (bound[0], bound[1] is None, bound[1] or 0))
+        if not bounds or bounds[0][0] != 0:
+            return False
+        reached = bounds[0][1]
+        for low, high in bounds[1:]:
+            if reached is None or low > reached:
+                break
+            reached = None if high is None else max(reached, high)
+        return reached is None
+    
+    def result_count(self, soup):
+        """搜索结果总数（"3,000以上の結果" 取下限），读不到返回None"""
+        info = soup.select_one('[data-component-type="s-result-info-bar"]')
+        if not info:
+            return None
+        text = info.get_text(' ', strip=True)
+        counts = re.findall(r'([\d,]+)\s*(?:件以上|以上|件)?\s*の(?:検索)?結果', text)
+        counts += re.findall(r'([\d,]+)\s*results', text)
+        counts = [int(count.replace(',', '')) for count in counts if count.strip(',')]
+        return max(counts) if counts else None
+    
+    def page_count(self, soup):
+        """分页栏中的最大页码，读不到返回None"""
+        pages = [int(item.get_text(strip=True))
+                 for item in soup.select('.s-pagination-item')
+                 if item.get_text(strip=True).isdigit()]
+        return max(pages) if pages else None
+    
+    def exceeds(self, soup, max_pages):
+        """该分片的结果是否超出 max_pages 页能取到的范围；无法判断时按未超出处理"""
+        count = self.result_count(soup)
+        per_page = len(soup.select('div[data-component-type="s-search-result"]'))
+        if count and per_page:
+            return count > per_page * max_pages
+        pages = self.page_count(soup)
+        return bool(pages and pages > max_pages)
+    
+    def split(self, shard, soup, max_pages):
+        """根据分片第一页决定是否细分，返回 (维度, 子分片列表)；无需细分时返回 (None, [])
+        
+        类目和价格子分片必须覆盖父分片的全部结果，父分片不再继续翻页：
+        类目超过 max_categories 个时不按类目拆分，改按价格拆分；
+        页面上的价格区间不能覆盖全部价格时改用 PRICE_RANGES（首尾开放）。
+        排序子分片不含默认排序，父分片本身即默认排序，应继续翻页。
+        """
+        if not self.exceeds(soup, max_pages):
+            return None, []
+        for depth in range(shard['depth'], len(self.FACETS)):
+            facet = self.FACETS[depth]
+            if facet == 'category':
+                values = [(f'n:{node}', name) for node, name in self.discover_categories(soup)]
+                if len(values) > self.max_categories:
+                    continue
+            elif facet == 'price':
+                ranges = self.discover_price_ranges(soup)
+                if not self.covers_all_prices(ranges):
+                    ranges = [(f'{low or ""}-{high or ""}', f'¥{low or 0}-{high or ""}')
+                              for low, high in self.price_ranges]
+                values = [(f'p_36:{value}', label) for value, label in ranges]
+            else:
+                values = [(sort, sort) for sort in self.sort_orders if sort]
+            # 只有一个取值时细分不会缩小结果集
+            if len(values) < (1 if facet == 'sort' else 2):
+                continue
+            return facet, [self._child(shard, facet, value, label, depth + 1) for value, label in values]
+        return None, []
+    
+    def _child(self, shard, facet, value, label, depth):
+        refinements = list(shard['refinements'])
+        sort = shard['sort']
+        if facet == 'sort':
+            sort = value
+        else:
+            refinements.append(value)
+        params = {}
+        if refinements:
+            params['rh'] = ','.join(refinements)
+        if sort:
+            params['s'] = sort
+        parent = '' if shard['label'] == '全部' else shard['label'] + ' / '
+        return {'label': parent + label, 'params': params, 'refinements': refinements,
+                'sort': sort, 'depth': depth}
 
 
 class SeleniumOnlyScraper:
@@ -35,34 +282,92 @@ class SeleniumOnlyScraper:
         self.is_searching = False
         self.save_directory = "amazon_data"
         os.makedirs(self.save_directory, exist_ok=True)
+        
+        # 重试与熔断
+        self.max_retries = 3
+        self.shard_max_attempts = 3   # 分片线程出错（浏览器崩溃等）时最多重新排队的次数
+        self.retry_base_delay = 2.0
+        self.retry_max_delay = 30.0
+        self.breaker = CircuitBreaker()
+        self._stats_lock = threading.Lock()
+        self.fetch_stats = {}
+        self._reset_fetch_stats()
+        
+        # 运行统计（供GUI统计面板读取）与逐条日志开关
+        self.run_stats = {}
+        self._reset_run_stats()
+        self.log_items = True
+        
+        # 字段提取命中率统计；设置 corpus_directory 后保存抓取的页面用于回放
+        self.profiler = ExtractionProfiler()
+        self.corpus_directory = None
     
     def search_products(self, keyword, max_pages=5, max_products=100,
-                       progress_callback=None, stop_flag=None):
-        """使用Selenium搜索产品和卖家信息"""
-        if not SELENIUM_OK:
+                       progress_callback=None, stop_flag=None, sharded=False, workers=2):
+        """使用Selenium搜索产品和卖家信息，结束后保存Excel，返回 (产品列表, 卖家列表)
+        
+        sharded=True 时按类目/价格/排序分片并行搜索（max_pages 为每个分片的页数）
+        """
+        all_products = []
+        all_sellers = []
+        
+        if sharded:
+            results = self.iter_products_sharded(keyword, max_pages, max_products,
+                                                 progress_callback, stop_flag, workers)
+        else:
+            results = self.iter_products(keyword, max_pages, max_products,
+                                         progress_callback, stop_flag)
+        for product, seller in results:
+            all_products.append(product)
+            if seller:
+                all_sellers.append(seller)
+        
+        # 保存结果
+        if all_products:
+            filename = self._save_to_excel(all_products, all_sellers)
+            if progress_callback:
+                progress_callback(f"💾 已保存到: {filename}")
+                progress_callback(f"✅ 完成！产品:{len(all_products)}, 卖家:{len(all_sellers)}")
+        else:
+            if progress_callback:
+                progress_callback("❌ 未获取到任何产品")
+        
+        if progress_callback and SELENIUM_OK:
+            progress_callback(self._format_fetch_stats())
+        
+        if self.profiler.fields:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            profile_path = self.profiler.save(
+                os.path.join(self.save_directory, f"extraction_profile_{timestamp}.json"))
+            if progress_callback:
+                progress_callback(f"📈 提取命中率: {self.profiler.format_summary()}")
+                progress_callback(f"📈 命中率报告: {profile_path}")
+        
+        return all_products, all_sellers
+    
+    def iter_products(self, keyword, max_pages=5, max_products=100,
+                      progress_callback=None, stop_flag=None):
+        """逐个产出 (产品, 卖家信息) - 卖家获取失败时为 None
+        
+        按调用方的迭代节奏抓取，不累积结果；提前停止迭代或调用 close() 时关闭浏览器。
+        """
+        if not load_selenium():
             if progress_callback:
                 progress_callback("❌ Selenium未安装，请运行: pip install selenium undetected-chromedriver")
-            return [], []
+            return
         
         self.is_searching = True
-        all_products = []
-        all_sellers = []
+        self._reset_fetch_stats()
+        self._reset_run_stats()
+        self.profiler = ExtractionProfiler()
+        count = 0
         driver = None
         
         try:
             if progress_callback:
                 progress_callback("🚀 启动无头浏览器...")
             
-            # 创建无头浏览器
-            options = uc.ChromeOptions()
-            options.add_argument('--headless=new')
-            options.add_argument('--disable-gpu')
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--lang=ja-JP')
-            
-            driver = uc.Chrome(options=options)
-            driver.set_page_load_timeout(30)
+            driver = self._create_driver()
             
             if progress_callback:
                 progress_callback("✅ 浏览器启动成功")
@@ -76,90 +381,57 @@ class SeleniumOnlyScraper:
                     progress_callback(f"🔍 搜索第 {page}/{max_pages} 页...")
                 
                 try:
-                    # 访问搜索页
-                    search_url = f"{self.base_url}/s?k={keyword}&page={page}"
-                    driver.get(search_url)
-                    
-                    # 等待加载
-                    try:
-                        WebDriverWait(driver, 15).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, 'div[data-component-type="s-search-result"]'))
-                        )
-                    except:
-                        if progress_callback:
-                            progress_callback(f"⚠️ 第{page}页加载超时")
-                        continue
-                    
-                    # 解析产品 - 直接用BeautifulSoup解析完整页面
-                    soup = BeautifulSoup(driver.page_source, 'html.parser')
-                    items = soup.select('div[data-component-type="s-search-result"]')
+                    products = self._search_page(driver, keyword, page, progress_callback, stop_flag)
+                except Exception as e:
+                    if progress_callback:
+                        progress_callback(f"❌ 第{page}页出错: {e}")
+                    continue
+                # None 为加载失败（已重试），继续下一页；空列表为无结果/超出末页，后面不会再有产品
+                if products is None:
+                    continue
+                if not products:
+                    break
+                
+                for product in products:
+                    if stop_flag and not stop_flag():
+                        break
                     
-                    if not items:
-                        if progress_callback:
-                            progress_callback(f"⚠️ 第{page}页无产品")
-                        continue
+                    if count >= max_products:
+                        break
                     
-                    if progress_callback:
-                        progress_callback(f"📦 第{page}页找到{len(items)}个产品")
+                    if progress_callback and self.log_items:
+                        progress_callback(f"📋 [{count+1}/{max_products}] {product['title'][:30]}...")
                     
-                    # 提取每个产品 - items已经是BeautifulSoup对象
-                    for idx, item in enumerate(items, 1):
-                        if stop_flag and not stop_flag():
-                            break
-                        
-                        if len(all_products) >= max_products:
-                            break
-                        
-                        try:
-                            # item已经是BeautifulSoup的Tag对象，直接提取
-                            product = self._extract_product(item)
-                            if not product or not product.get('url'):
-                                continue
-                            
-                            if progress_callback:
-                                progress_callback(f"📋 [{len(all_products)+1}/{max_products}] {product['title'][:30]}...")
-                            
-                            all_products.append(product)
-                            
-                            # 获取卖家信息
-                            if product['url']:
-                                seller = self._get_seller_with_browser(driver, product, progress_callback)
-                                if seller:
-                                    all_sellers.append(seller)
-                            
-                            # 延迟
-                            time.sleep(random.uniform(0.5, 1.0))
-                            
-                        except Exception as e:
-                            if progress_callback:
-                                progress_callback(f"⚠️ 产品处理失败: {e}")
+                    count += 1
+                    self.run_stats['products'] += 1
                     
-                    if len(all_products) >= max_products:
-                        break
+                    # 获取卖家信息
+                    seller = None
+                    try:
+                        seller = self._get_seller_with_browser(driver, product, progress_callback, stop_flag)
+                    except Exception as e:
+                        if progress_callback:
+                            progress_callback(f"⚠️ 产品处理失败: {e}")
+                    if seller:
+                        if seller['seller_name'] != '未知卖家':
+                            self.run_stats['sellers'] += 1
+                    else:
+                        self.run_stats['errors'] += 1
                     
-                    # 页面间延迟
-                    time.sleep(random.uniform(2, 3))
+                    yield product, seller
                     
-                except Exception as e:
-                    if progress_callback:
-                        progress_callback(f"❌ 第{page}页出错: {e}")
-            
-            # 保存结果
-            if all_products:
-                filename = self._save_to_excel(all_products, all_sellers)
-                if progress_callback:
-                    progress_callback(f"💾 已保存到: {filename}")
-                    progress_callback(f"✅ 完成！产品:{len(all_products)}, 卖家:{len(all_sellers)}")
-            else:
-                if progress_callback:
-                    progress_callback("❌ 未获取到任何产品")
-            
-            return all_products, all_sellers
+                    # 延迟
+                    time.sleep(random.uniform(0.5, 1.0))
+                
+                if count >= max_products:
+                    break
+                
+                # 页面间延迟
+                time.sleep(random.uniform(2, 3))
             
         except Exception as e:
             if progress_callback:
                 progress_callback(f"❌ 严重错误: {e}")
-            return all_products, all_sellers
         finally:
             if driver:
                 try:
@@ -170,6 +442,400 @@ class SeleniumOnlyScraper:
                     pass
             self.is_searching = False
     
+    def iter_products_sharded(self, keyword, max_pages=5, max_products=100,
+                              progress_callback=None, stop_flag=None, workers=2, planner=None):
+        """分片并行搜索 - 逐个产出 (产品, 卖家信息)
+        
+        从不加筛选的搜索开始，由 workers 个浏览器并行抓取，每个分片最多 max_pages 页。
+        分片第一页显示的结果数超出 max_pages 页时，按 ShardPlanner 细分出子分片继续抓取。
+        ASIN 在分片之间去重。结果队列有界，调用方不取时工作线程等待。
+        """
+        if not load_selenium():
+            if progress_callback:
+                progress_callback("❌ Selenium未安装，请运行: pip install selenium undetected-chromedriver")
+            return
+        
+        planner = planner or ShardPlanner()
+        self.is_searching = True
+        self._reset_fetch_stats()
+        self._reset_run_stats()
+        self.profiler = ExtractionProfiler()
+        
+        stop_event = threading.Event()
+        should_continue = lambda: not stop_event.is_set() and (stop_flag is None or stop_flag())
+        seen_lock = threading.Lock()
+        seen_asins = set()
+        shard_queue = queue.Queue()
+        # 已入队但尚未处理完的分片数，为0时工作线程才能退出（处理中的分片可能还会细分）
+        open_shards = [0]
+        results = queue.Queue(maxsize=workers * 2)
+        threads = []
+        
+        def claim(asin):
+            """登记ASIN，重复或已达上限时返回False"""
+            with seen_lock:
+                if asin in seen_asins or len(seen_asins) >= max_products:
+                    return False
+                seen_asins.add(asin)
+                return True
+        
+        def full():
+            with seen_lock:
+                return len(seen_asins) >= max_products
+        
+        def add_shards(shards):
+            with seen_lock:
+                open_shards[0] += len(shards)
+            for shard in shards:
+                shard_queue.put(shard)
+        
+        def put_result(item):
+            while should_continue():
+                try:
+                    results.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        
+        def run_shard(driver, shard):
+            added = 0
+            # 重新排队的分片从上次未完成的页继续
+            for page in range(shard.get('next_page', 1), max_pages + 1):
+                if not should_continue() or full():
+                    break
+                if progress_callback:
+                    progress_callback(f"🔍 [{shard['label']}] 第 {page}/{max_pages} 页...")
+                soup, products = self._load_search_page(driver, keyword, page, progress_callback,
+                                                        should_continue, shard['params'])
+                if not products:
+                    break
+                if page == 1:
+                    facet, children = planner.split(shard, soup, max_pages)
+                    if children:
+                        add_shards(children)
+                        if progress_callback:
+                            progress_callback(f"🧩 [{shard['label']}] 结果超过 {max_pages} 页，"
+                                              f"按{planner.FACET_LABELS[facet]}拆分为 {len(children)} 个分片")
+                        # 类目/价格子分片已覆盖本分片的全部结果
+                        if facet != 'sort':
+                            break
+                new_products = [product for product in products if claim(product['asin'])]
+                # 整页都是已抓取过的ASIN，说明该分片已饱和
+                if not new_products:
+                    break
+                for product in new_products:
+                    if not should_continue():
+                        break
+                    seller = self._get_seller_with_browser(driver, product, progress_callback,
+                                                           should_continue)
+                    if not put_result((product, seller)):
+                        break
+                    added += 1
+                    time.sleep(random.uniform(0.5, 1.0))
+                shard['next_page'] = page + 1
+                time.sleep(random.uniform(2, 3))
+            if progress_callback:
+                progress_callback(f"🧩 [{shard['label']}] 完成，新增 {added} 个产品")
+        
+        def run_shards():
+            driver = None
+            try:
+                # 产品数已达上限后不再领取分片
+                while should_continue() and not full():
+                    try:
+                        shard = shard_queue.get(timeout=0.5)
+                    except queue.Empty:
+                        with seen_lock:
+                            if not open_shards[0]:
+                                break
+                        continue
+                    try:
+                        if driver is None:
+                            driver = self._create_driver()
+                        run_shard(driver, shard)
+                    except Exception as e:
+                        # 浏览器可能已不可用，下一个分片重建
+                        if driver:
+                            try:
+                                driver.quit()
+                            except:
+                                pass
+                            driver = None
+                        shard['failures'] = shard.get('failures', 0) + 1
+                        if shard['failures'] < self.shard_max_attempts:
+                            if progress_callback:
+                                progress_callback(f"⚠️ [{shard['label']}] 出错，重新排队: {e}")
+                            add_shards([shard])
+                        elif progress_callback:
+                            progress_callback(f"❌ [{shard['label']}] 连续出错 {shard['failures']} 次，已放弃: {e}")
+                    finally:
+                        with seen_lock:
+                            open_shards[0] -= 1
+            finally:
+                if driver:
+                    try:
+                        driver.quit()
+                    except:
+                        pass
+        
+        try:
+            if progress_callback:
+                progress_callback(f"🚀 启动无头浏览器（{workers} 个并行）...")
+            
+            add_shards([planner.root()])
+            for _ in range(workers):
+                thread = threading.Thread(target=run_shards, daemon=True)
+                thread.start()
+                threads.append(thread)
+            
+            count = 0
+            while count < max_products:
+                try:
+                    product, seller = results.get(timeout=0.5)
+                except queue.Empty:
+                    if not any(thread.is_alive() for thread in threads) and results.empty():
+                        break
+                    if stop_flag and not stop_flag():
+                        break
+                    continue
+                
+                count += 1
+                self.run_stats['products'] += 1
+                if seller:
+                    if seller['seller_name'] != '未知卖家':
+                        self.run_stats['sellers'] += 1
+                else:
+                    self.run_stats['errors'] += 1
+                if progress_callback and self.log_items:
+                    progress_callback(f"📋 [{count}/{max_products}] {product['title'][:30]}...")
+                
+                yield product, seller
+            
+        except Exception as e:
+            if progress_callback:
+                progress_callback(f"❌ 严重错误: {e}")
+        finally:
+            stop_event.set()
+            for thread in threads:
+                thread.join()
+            if progress_callback and threads:
+                progress_callback("🔒 浏览器已关闭")
+            self.is_searching = False
+    
+    async def aiter_products(self, keyword, max_pages=5, max_products=100,
+                             progress_callback=None, stop_flag=None):
+        """iter_products 的异步版本 - 在专用线程中推进，不阻塞事件循环"""
+        import asyncio
+        
+        products = self.iter_products(keyword, max_pages, max_products,
+                                      progress_callback, stop_flag)
+        loop = asyncio.get_running_loop()
+        # 单线程执行器保证 next() 与 close() 不会并发执行
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            while True:
+                item = await loop.run_in_executor(executor, next, products, None)
+                if item is None:
+                    break
+                yield item
+        finally:
+            await loop.run_in_executor(executor, products.close)
+            executor.shutdown(wait=False)
+    
+    def _create_driver(self):
+        """创建无头浏览器"""
+        if not load_selenium():
+            raise RuntimeError("Selenium未安装，请运行: pip install selenium undetected-chromedriver")
+        
+        options = uc.ChromeOptions()
+        options.add_argument('--headless=new')
+        options.add_argument('--disable-gpu')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--lang=ja-JP')
+        
+        driver = uc.Chrome(options=options)
+        driver.set_page_load_timeout(30)
+        return driver
+    
+    def _search_url(self, keyword, page, params=None):
+        query = {'k': keyword}
+        query.update(params or {})
+        query['page'] = page
+        return f"{self.base_url}/s?{urlencode(query)}"
+    
+    def _search_page(self, driver, keyword, page, progress_callback=None, stop_flag=None, params=None):
+        """抓取一页搜索结果，返回产品列表；页面加载失败返回None
+        
+        params 为附加的搜索URL参数（分片用）
+        """
+        return self._load_search_page(driver, keyword, page, progress_callback, stop_flag, params)[1]
+    
+    def _load_search_page(self, driver, keyword, page, progress_callback=None, stop_flag=None, params=None):
+        """抓取一页搜索结果，返回 (soup, 产品列表)；页面加载失败时产品列表为None"""
+        soup, outcome = self._fetch_page(driver, self._search_url(keyword, page, params), 'search',
+                                         progress_callback, stop_flag)
+        # 'empty' 为无搜索结果的正常页面，下面按无产品处理
+        if outcome not in ('ok', 'empty'):
+            if progress_callback and outcome != 'stopped':
+                progress_callback(f"⚠️ 第{page}页加载失败 ({outcome})")
+            return soup, None
+        
+        # 解析产品 - 直接用BeautifulSoup解析完整页面
+        items = soup.select('div[data-component-type="s-search-result"]')
+        
+        if not items:
+            if progress_callback:
+                progress_callback(f"⚠️ 第{page}页无产品")
+            return soup, []
+        
+        if progress_callback:
+            progress_callback(f"📦 第{page}页找到{len(items)}个产品")
+        
+        # 提取每个产品 - items已经是BeautifulSoup的Tag对象
+        products = []
+        for item in items:
+            product = self._extract_product(item)
+            if product and product.get('url'):
+                products.append(product)
+        return soup, products
+    
+    def _reset_run_stats(self):
+        self.run_stats = {
+            'products': 0,
+            'sellers': 0,     # 识别出卖家名称的产品数
+            'errors': 0,      # 卖家信息获取失败的产品数
+            'started_at': time.time(),
+        }
+    
+    def _reset_fetch_stats(self):
+        with self._stats_lock:
+            self.fetch_stats = {
+                'ok': 0,          # 一次或重试后加载成功
+                'retries': 0,     # 重试次数
+                'captcha': 0,     # 遇到验证码
+                'empty': 0,       # 正常加载但无内容（无搜索结果）
+                'invalid': 0,     # 加载完成但缺少标志元素
+                'error': 0,       # 浏览器异常
+                'failed': 0,      # 重试耗尽
+                'breaker_trips': 0,
+            }
+    
+    def _count(self, outcome):
+        with self._stats_lock:
+            self.fetch_stats[outcome] = self.fetch_stats.get(outcome, 0) + 1
+    
+    def _format_fetch_stats(self):
+        stats = dict(self.fetch_stats)
+        return (f"📊 页面统计: 成功{stats['ok']}, 重试{stats['retries']}, 验证码{stats['captcha']}, "
+                f"无结果{stats['empty']}, 无效{stats['invalid']}, 异常{stats['error']}, 放弃{stats['failed']}, "
+                f"熔断{stats['breaker_trips']}")
+    
+    def _sleep(self, seconds, stop_flag=None):
+        """可被停止标志打断的延迟，被停止时返回False"""
+        deadline = time.time() + seconds
+        while True:
+            if stop_flag and not stop_flag():
+                return False
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return True
+            time.sleep(min(remaining, 0.5))
+    
+    def _fetch_page(self, driver, url, page_type, progress_callback=None, stop_flag=None):
+        """加载页面 - 校验页面类型、检测验证码、指数退避重试、熔断
+        
+        返回 (soup, outcome)。outcome 为 'ok' 时 soup 为完整页面；
+        'empty' 为正常加载但无内容的页面（如无搜索结果），不重试；
+        'invalid' 时 soup 为最后一次加载的页面（缺少标志元素）；
+        'captcha' / 'error' / 'stopped' 时 soup 为 None。
+        """
+        wait_selector = f'{PAGE_READY_SELECTORS[page_type]}, {CAPTCHA_SELECTOR}'
+        empty_markers = PAGE_EMPTY_MARKERS.get(page_type, ())
+        
+        def page_state(d):
+            if d.find_elements(By.CSS_SELECTOR, wait_selector):
+                return 'ready'
+            if empty_markers and any(marker in d.page_source for marker in empty_markers):
+                return 'empty'
+            return False
+        
+        soup = None
+        outcome = 'error'
+        
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.wait(stop_flag):
+                return None, 'stopped'
+            
+            if attempt:
+                self._count('retries')
+                delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (attempt - 1))
+                if not self._sleep(delay * random.uniform(0.8, 1.2), stop_flag):
+                    return None, 'stopped'
+            
+            try:
+                driver.get(url)
+                try:
+                    state = WebDriverWait(driver, PAGE_WAIT_TIMEOUTS[page_type]).until(page_state)
+                except TimeoutException:
+                    state = 'invalid'
+                html = driver.page_source
+            except Exception as e:
+                outcome = 'error'
+                self._count('error')
+                if progress_callback:
+                    progress_callback(f"   ⚠️ 页面加载异常 (第{attempt + 1}次): {e}")
+                continue
+            
+            if is_captcha_page(html):
+                outcome = 'captcha'
+                soup = None
+                self._count('captcha')
+                if progress_callback:
+                    progress_callback(f"   🤖 检测到验证码 (第{attempt + 1}次)")
+                pause = self.breaker.record(True)
+                if pause:
+                    self._count('breaker_trips')
+                    if progress_callback:
+                        progress_callback(f"🛑 封锁率过高，暂停抓取 {pause:.0f} 秒")
+                continue
+            
+            if state == 'empty':
+                self.breaker.record(False)
+                self._count('empty')
+                self._save_to_corpus(page_type, url, html)
+                return BeautifulSoup(html, 'html.parser'), 'empty'
+            
+            if state == 'ready':
+                # 只有确认正常的页面才计为未封锁；缺少标志元素的页面（503、软封锁）不计入
+                self.breaker.record(False)
+                settle = PAGE_SETTLE_DELAYS[page_type]
+                if settle:
+                    time.sleep(settle)
+                    html = driver.page_source
+                self._count('ok')
+                self._save_to_corpus(page_type, url, html)
+                return BeautifulSoup(html, 'html.parser'), 'ok'
+            
+            outcome = 'invalid'
+            self._save_to_corpus(page_type, url, html)
+            soup = BeautifulSoup(html, 'html.parser')
+            self._count('invalid')
+        
+        self._count('failed')
+        return soup, outcome
+    
+    def _save_to_corpus(self, page_type, url, html):
+        """保存页面HTML到回放语料目录（文件名: 页面类型_URL哈希.html）"""
+        if not self.corpus_directory:
+            return
+        os.makedirs(self.corpus_directory, exist_ok=True)
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()[:12]
+        path = os.path.join(self.corpus_directory, f"{page_type}_{digest}.html")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(html)
+    
     def _extract_product(self, element):
         """提取产品信息"""
         try:
@@ -226,83 +892,20 @@ class SeleniumOnlyScraper:
             print(f"提取产品失败: {e}")
             return None
     
-    def _get_seller_with_browser(self, driver, product, progress_callback):
+    def _get_seller_with_browser(self, driver, product, progress_callback, stop_flag=None):
         """使用浏览器获取卖家信息"""
         try:
-            # 访问产品页
-            driver.get(product['url'])
-            
-            # 等待页面加载
-            try:
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, '#merchant-info, #buybox, #tabular-buybox, #availability'))
-                )
-            except:
-                pass
-            
-            time.sleep(1)
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            
-            # 提取卖家名称和链接
-            seller_name = '未知卖家'
-            seller_url = ''
-            
-            # 方法1: merchant-info区域（最常见）
-            merchant_info = soup.select_one('#merchant-info')
-            if merchant_info:
-                link = merchant_info.select_one('a[href*="seller="], a[href*="/sp?"], a[href*="/shops/"]')
-                if link:
-                    seller_name = link.get_text(strip=True)
-                    seller_url = urljoin(self.base_url, link.get('href'))
-            
-            # 方法2: tabular-buybox区域
-            if seller_name == '未知卖家':
-                tabular = soup.select_one('#tabular-buybox')
-                if tabular:
-                    # 查找"配送方"标签
-                    seller_row = None
-                    for span in tabular.find_all('span', string=re.compile(r'配送方|販売元|出品者|Sold by')):
-                        seller_row = span.find_parent('div', class_=re.compile(r'tabular'))
-                        if seller_row:
-                            break
-                    
-                    if seller_row:
-                        link = seller_row.select_one('a[href*="seller="], a[href*="/sp?"]')
-                        if link:
-                            seller_name = link.get_text(strip=True)
-                            seller_url = urljoin(self.base_url, link.get('href'))
-            
-            # 方法3: 直接搜索"配送方"文本
-            if seller_name == '未知卖家':
-                text = soup.get_text()
-                # 查找"配送方 Amazon" 或 "配送方 SENNWAK 直営店"这样的模式
-                seller_match = re.search(r'配送方[：:\s]+([^\n\r]{2,50})', text)
-                if seller_match:
-                    seller_name = seller_match.group(1).strip()
-                    # 尝试找到对应的链接
-                    for link in soup.find_all('a', href=re.compile(r'/sp\?|seller=')):
-                        link_text = link.get_text(strip=True)
-                        if link_text and link_text in seller_name:
-                            seller_url = urljoin(self.base_url, link.get('href'))
-                            break
+            # 访问产品页（缺少标志元素时仍尝试解析）
+            soup, outcome = self._fetch_page(driver, product['url'], 'product',
+                                             progress_callback, stop_flag)
+            if soup is None:
+                if progress_callback and outcome != 'stopped':
+                    progress_callback(f"   ⚠️ 产品页加载失败 ({outcome})")
+                return None
             
-            # 方法4: 直接查找所有seller=链接（最通用）
-            if seller_name == '未知卖家':
-                seller_links = soup.find_all('a', href=re.compile(r'seller='))
-                if seller_links:
-                    # 优先选择带有店铺名称的链接
-                    for link in seller_links:
-                        text = link.get_text(strip=True)
-                        href = link.get('href')
-                        # 过滤掉空文本和无关链接
-                        if text and len(text) > 2 and len(text) < 100:
-                            # 排除一些常见的无关文本
-                            if text not in ['詳細', '詳細を見る', 'View details', 'More', 'Learn more']:
-                                seller_name = text
-                                seller_url = urljoin(self.base_url, href)
-                                break
+            seller_name, seller_url = self._parse_seller_from_product_page(soup)
             
-            if progress_callback:
+            if progress_callback and self.log_items:
                 progress_callback(f"   🏪 卖家: {seller_name}")
             
             seller_info = {
@@ -322,7 +925,8 @@ class SeleniumOnlyScraper:
             # 如果有卖家链接且不是Amazon，获取详细信息
             if seller_url and 'amazon' not in seller_name.lower():
                 time.sleep(random.uniform(1.5, 2.5))
-                details = self._get_seller_details_with_browser(driver, seller_url)
+                details = self._get_seller_details_with_browser(driver, seller_url,
+                                                                progress_callback, stop_flag)
                 seller_info.update(details)
             
             return seller_info
@@ -331,122 +935,195 @@ class SeleniumOnlyScraper:
                 progress_callback(f"   ⚠️ 卖家信息获取失败: {e}")
             return None
     
-    def _get_seller_details_with_browser(self, driver, seller_url):
+    def _get_seller_details_with_browser(self, driver, seller_url, progress_callback=None, stop_flag=None):
         """使用浏览器获取卖家详细信息 - 根据Amazon日本卖家页面结构"""
         try:
-            driver.get(seller_url)
-            
-            # 等待详细信息加载
-            try:
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, 'body'))
-                )
-            except:
-                pass
-            
-            time.sleep(2)
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            text = soup.get_text()
-            
-            details = {}
-            
-            # Business Name (事業者名) - 从"详尽的卖家信息"区域提取
-            business_patterns = [
-                r'Business Name[：:\s]*([^P\n]{3,100})(?:Phone|TEL|电话)',  # 匹配到Phone之前
-                r'事業者名[：:\s]*([^\n]{3,100})',
-                r'会社名[：:\s]*([^\n]{3,100})',
-                r'販売業者[：:\s]*([^\n]{3,100})',
-            ]
-            for pattern in business_patterns:
-                match = re.search(pattern, text)
-                if match:
-                    biz_name = match.group(1).strip()
-                    # 清理可能的换行和多余空格
-                    biz_name = re.sub(r'\s+', ' ', biz_name)
-                    details['business_name'] = biz_name
-                    break
-            
-            # Phone (咨询用电话号码) - 优先匹配标签后的数字
-            phone_patterns = [
-                r'Phone Number[：:\s]*(\d{10,15})',
-                r'咨询用电话号码[：:\s]*(\d{10,15})',
-                r'電話番号[：:\s]*(\d{10,15})',
-                r'TEL[：:\s]*(\d{10,15})',
-                r'电话[：:\s]*(\d{10,15})',
-                r'Tel[：:\s]*(\d{10,15})',
-                # 匹配独立的11位数字（中国手机号）
-                r'(?:^|\n|\s)(\d{11})(?:\n|\s|Address|地址)',
-                # 匹配日本电话号码格式（带连字符）
-                r'(\d{2,4}[-\s]\d{2,4}[-\s]\d{4})',
-            ]
-            for pattern in phone_patterns:
-                match = re.search(pattern, text)
-                if match:
-                    phone = match.group(1).strip()
-                    # 清理电话号码中的连字符和空格
-                    phone = re.sub(r'[-\s]', '', phone)
-                    # 验证是合理的电话号码长度
-                    if len(phone) >= 10:
-                        details['phone'] = phone
-                        break
-            
-            # Address (地址) - 提取完整地址
-            address_patterns = [
-                r'Address[：:\s]*([^\n]{15,250}CN)',  # 匹配到CN结尾
-                r'地址[：:\s]*([^\n]{15,200})',
-                r'住所[：:\s]*([^\n]{15,200})',
-                # 直接匹配带Building的地址格式
-                r'(\d+,\s*Building\s+A\d[^\n]+?CN)',
-            ]
-            for pattern in address_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    addr = match.group(1).strip()
-                    # 清理地址中的多余空格和换行
-                    addr = re.sub(r'\s+', ' ', addr)
-                    # 移除可能的尾部垃圾
-                    addr = re.sub(r'(CN).*$', r'\1', addr)
-                    details['address'] = addr
-                    break
-            
-            # Email
-            email_match = re.search(r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})', text)
-            if email_match:
-                details['email'] = email_match.group(1)
-            
-            # Fax
-            fax_patterns = [
-                r'FAX[：:\s]*(\d{10,15})',
-                r'ファックス[：:\s]*(\d{10,15})',
-                r'传真[：:\s]*(\d{10,15})',
-            ]
-            for pattern in fax_patterns:
-                match = re.search(pattern, text)
-                if match:
-                    details['fax'] = match.group(1).strip()
-                    break
-            
-            # 购物代表姓名 (如果有)
-            rep_match = re.search(r'購物代表的姓名[：:\s]*([^\n]{2,30})', text)
-            if not rep_match:
-                rep_match = re.search(r'代表者氏名[：:\s]*([^\n]{2,30})', text)
-            if rep_match:
-                details['representative'] = rep_match.group(1).strip()
-            
-            # 店铺名 (商店名)
-            store_match = re.search(r'商店名[：:\s]*([^\n]{2,50})', text)
-            if not store_match:
-                store_match = re.search(r'店舗名[：:\s]*([^\n]{2,50})', text)
-            if store_match:
-                details['store_name'] = store_match.group(1).strip()
-            
-            return details
+            soup, outcome = self._fetch_page(driver, seller_url, 'seller',
+                                             progress_callback, stop_flag)
+            if soup is None:
+                if progress_callback and outcome != 'stopped':
+                    progress_callback(f"   ⚠️ 卖家页加载失败 ({outcome})")
+                return {}
+            return self._parse_seller_details(soup.get_text())
         except Exception as e:
             print(f"提取卖家详情失败: {e}")
             return {}
     
+    def _first_hit(self, field, candidates):
+        """按顺序尝试 (标签, 提取函数)，记录命中的规则、耗时和回退深度，返回第一个非空结果"""
+        for depth, (label, extract) in enumerate(candidates):
+            start = time.perf_counter()
+            value = extract()
+            self.profiler.attempt(field, label, depth, time.perf_counter() - start, bool(value))
+            if value:
+                self.profiler.record(field, depth)
+                return value
+        self.profiler.record(field, None)
+        return None
+    
+    def _match_patterns(self, field, patterns, text, flags=0, clean=str.strip):
+        """按顺序尝试正则，clean 处理第1组并可返回None表示不接受"""
+        def extractor(pattern):
+            def extract():
+                match = re.search(pattern, text, flags)
+                return clean(match.group(1)) if match else None
+            return extract
+        return self._first_hit(field, [(pattern, extractor(pattern)) for pattern in patterns])
+    
+    def _parse_seller_from_product_page(self, soup):
+        """从产品页解析卖家名称和链接，返回 (seller_name, seller_url)"""
+        
+        # 方法1: merchant-info区域（最常见）
+        def from_merchant_info():
+            merchant_info = soup.select_one('#merchant-info')
+            if merchant_info:
+                link = merchant_info.select_one('a[href*="seller="], a[href*="/sp?"], a[href*="/shops/"]')
+                if link:
+                    return link.get_text(strip=True), urljoin(self.base_url, link.get('href'))
+            return None
+        
+        # 方法2: tabular-buybox区域
+        def from_tabular_buybox():
+            tabular = soup.select_one('#tabular-buybox')
+            if tabular:
+                # 查找"配送方"标签
+                seller_row = None
+                for span in tabular.find_all('span', string=re.compile(r'配送方|販売元|出品者|Sold by')):
+                    seller_row = span.find_parent('div', class_=re.compile(r'tabular'))
+                    if seller_row:
+                        break
+                
+                if seller_row:
+                    link = seller_row.select_one('a[href*="seller="], a[href*="/sp?"]')
+                    if link:
+                        return link.get_text(strip=True), urljoin(self.base_url, link.get('href'))
+            return None
+        
+        # 方法3: 直接搜索"配送方"文本
+        def from_text():
+            text = soup.get_text()
+            # 查找"配送方 Amazon" 或 "配送方 SENNWAK 直営店"这样的模式
+            seller_match = re.search(r'配送方[：:\s]+([^\n\r]{2,50})', text)
+            if seller_match:
+                seller_name = seller_match.group(1).strip()
+                seller_url = ''
+                # 尝试找到对应的链接
+                for link in soup.find_all('a', href=re.compile(r'/sp\?|seller=')):
+                    link_text = link.get_text(strip=True)
+                    if link_text and link_text in seller_name:
+                        seller_url = urljoin(self.base_url, link.get('href'))
+                        break
+                return seller_name, seller_url
+            return None
+        
+        # 方法4: 直接查找所有seller=链接（最通用）
+        def from_seller_links():
+            # 优先选择带有店铺名称的链接
+            for link in soup.find_all('a', href=re.compile(r'seller=')):
+                text = link.get_text(strip=True)
+                # 过滤掉空文本和无关链接
+                if text and len(text) > 2 and len(text) < 100:
+                    # 排除一些常见的无关文本
+                    if text not in ['詳細', '詳細を見る', 'View details', 'More', 'Learn more']:
+                        return text, urljoin(self.base_url, link.get('href'))
+            return None
+        
+        found = self._first_hit('seller_name', [
+            ('#merchant-info', from_merchant_info),
+            ('#tabular-buybox', from_tabular_buybox),
+            ('配送方 文本', from_text),
+            ('a[href*="seller="]', from_seller_links),
+        ])
+        return found or ('未知卖家', '')
+    
+    def _parse_seller_details(self, text):
+        """从卖家页文本解析详细信息 - 根据Amazon日本卖家页面结构"""
+        details = {}
+        
+        def collapse(value):
+            # 清理可能的换行和多余空格
+            return re.sub(r'\s+', ' ', value.strip())
+        
+        def clean_phone(value):
+            # 清理电话号码中的连字符和空格，验证是合理的电话号码长度
+            phone = re.sub(r'[-\s]', '', value.strip())
+            return phone if len(phone) >= 10 else None
+        
+        def clean_address(value):
+            # 清理地址中的多余空格和换行，移除可能的尾部垃圾
+            return re.sub(r'(CN).*$', r'\1', collapse(value))
+        
+        # Business Name (事業者名) - 从"详尽的卖家信息"区域提取
+        business_patterns = [
+            r'Business Name[：:\s]*([^P\n]{3,100})(?:Phone|TEL|电话)',  # 匹配到Phone之前
+            r'事業者名[：:\s]*([^\n]{3,100})',
+            r'会社名[：:\s]*([^\n]{3,100})',
+            r'販売業者[：:\s]*([^\n]{3,100})',
+        ]
+        
+        # Phone (咨询用电话号码) - 优先匹配标签后的数字
+        phone_patterns = [
+            r'Phone Number[：:\s]*(\d{10,15})',
+            r'咨询用电话号码[：:\s]*(\d{10,15})',
+            r'電話番号[：:\s]*(\d{10,15})',
+            r'TEL[：:\s]*(\d{10,15})',
+            r'电话[：:\s]*(\d{10,15})',
+            r'Tel[：:\s]*(\d{10,15})',
+            # 匹配独立的11位数字（中国手机号）
+            r'(?:^|\n|\s)(\d{11})(?:\n|\s|Address|地址)',
+            # 匹配日本电话号码格式（带连字符）
+            r'(\d{2,4}[-\s]\d{2,4}[-\s]\d{4})',
+        ]
+        
+        # Address (地址) - 提取完整地址
+        address_patterns = [
+            r'Address[：:\s]*([^\n]{15,250}CN)',  # 匹配到CN结尾
+            r'地址[：:\s]*([^\n]{15,200})',
+            r'住所[：:\s]*([^\n]{15,200})',
+            # 直接匹配带Building的地址格式
+            r'(\d+,\s*Building\s+A\d[^\n]+?CN)',
+        ]
+        
+        email_patterns = [r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})']
+        
+        fax_patterns = [
+            r'FAX[：:\s]*(\d{10,15})',
+            r'ファックス[：:\s]*(\d{10,15})',
+            r'传真[：:\s]*(\d{10,15})',
+        ]
+        
+        # 购物代表姓名 (如果有)
+        representative_patterns = [
+            r'購物代表的姓名[：:\s]*([^\n]{2,30})',
+            r'代表者氏名[：:\s]*([^\n]{2,30})',
+        ]
+        
+        # 店铺名 (商店名)
+        store_patterns = [
+            r'商店名[：:\s]*([^\n]{2,50})',
+            r'店舗名[：:\s]*([^\n]{2,50})',
+        ]
+        
+        fields = [
+            ('business_name', business_patterns, 0, collapse),
+            ('phone', phone_patterns, 0, clean_phone),
+            ('address', address_patterns, re.IGNORECASE, clean_address),
+            ('email', email_patterns, 0, str.strip),
+            ('fax', fax_patterns, 0, str.strip),
+            ('representative', representative_patterns, 0, str.strip),
+            ('store_name', store_patterns, 0, str.strip),
+        ]
+        for field, patterns, flags, clean in fields:
+            value = self._match_patterns(field, patterns, text, flags, clean)
+            if value:
+                details[field] = value
+        
+        return details
+    
     def _save_to_excel(self, products, sellers):
         """保存到Excel"""
+        import pandas as pd
+        
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = os.path.join(self.save_directory, f"amazon_products_{timestamp}.xlsx")
         
@@ -492,6 +1169,10 @@ class SeleniumOnlyScraper:
 class SeleniumOnlyGUI:
     """纯Selenium GUI"""
     
+    LOG_FLUSH_INTERVAL_MS = 200   # 日志刷新周期
+    LOG_BATCH_SIZE = 500          # 每次刷新最多写入的行数
+    LOG_MAX_LINES = 2000          # 日志窗口保留的最大行数
+    
     def __init__(self, root):
         self.root = root
         self.root.title("Amazon Japan 卖家信息提取工具 - 纯Selenium版 v5.0")
@@ -500,8 +1181,11 @@ class SeleniumOnlyGUI:
         self.scraper = SeleniumOnlyScraper()
         self.search_thread = None
         self.is_searching = False
+        # 工作线程只入队，GUI定时批量写入
+        self.log_queue = queue.SimpleQueue()
         
         self.setup_gui()
+        self.root.after(self.LOG_FLUSH_INTERVAL_MS, self._flush_logs)
     
     def setup_gui(self):
         main_frame = ttk.Frame(self.root, padding="20")
@@ -531,6 +1215,16 @@ class SeleniumOnlyGUI:
         ttk.Entry(config_frame, textvariable=self.products_var, width=10).grid(
             row=2, column=1, sticky=tk.W, padx=(10, 0), pady=5)
         
+        ttk.Label(config_frame, text="分片搜索:").grid(row=3, column=0, sticky=tk.W, pady=5)
+        shard_frame = ttk.Frame(config_frame)
+        shard_frame.grid(row=3, column=1, sticky=tk.W, padx=(10, 0), pady=5)
+        self.sharded_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(shard_frame, text="按类目/价格/排序拆分（页数为每个分片的页数）",
+                        variable=self.sharded_var).grid(row=0, column=0, sticky=tk.W)
+        ttk.Label(shard_frame, text="浏览器数:").grid(row=0, column=1, padx=(10, 0))
+        self.workers_var = tk.StringVar(value="2")
+        ttk.Entry(shard_frame, textvariable=self.workers_var, width=5).grid(row=0, column=2, padx=(5, 0))
+        
         btn_frame = ttk.Frame(main_frame)
         btn_frame.grid(row=3, column=0, columnspan=2, pady=(0, 15))
         
@@ -540,12 +1234,21 @@ class SeleniumOnlyGUI:
         self.stop_btn = ttk.Button(btn_frame, text="⏹️ 停止", command=self.stop_search, state='disabled')
         self.stop_btn.grid(row=0, column=1, padx=(0, 10))
         
-        ttk.Button(btn_frame, text="📁 打开文件夹", command=self.open_folder).grid(row=0, column=2)
+        ttk.Button(btn_frame, text="📁 打开文件夹", command=self.open_folder).grid(row=0, column=2, padx=(0, 10))
+        
+        self.verbose_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(btn_frame, text="逐条日志", variable=self.verbose_var).grid(row=0, column=3)
+        
+        stats_frame = ttk.LabelFrame(main_frame, text="📊 实时统计", padding="10")
+        stats_frame.grid(row=4, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 15))
+        
+        self.stats_var = tk.StringVar(value=self._format_stats())
+        ttk.Label(stats_frame, textvariable=self.stats_var, font=('Consolas', 10)).grid(row=0, column=0, sticky=tk.W)
         
         log_frame = ttk.LabelFrame(main_frame, text="📝 运行日志", padding="15")
-        log_frame.grid(row=4, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S))
+        log_frame.grid(row=5, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S))
         
-        self.log_text = tk.Text(log_frame, height=22, width=70, font=('Consolas', 9))
+        self.log_text = tk.Text(log_frame, height=18, width=70, font=('Consolas', 9))
         scrollbar = ttk.Scrollbar(log_frame, orient="vertical", command=self.log_text.yview)
         self.log_text.configure(yscrollcommand=scrollbar.set)
         
@@ -555,7 +1258,7 @@ class SeleniumOnlyGUI:
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(0, weight=1)
         main_frame.columnconfigure(1, weight=1)
-        main_frame.rowconfigure(4, weight=1)
+        main_frame.rowconfigure(5, weight=1)
         config_frame.columnconfigure(1, weight=1)
         log_frame.columnconfigure(0, weight=1)
         log_frame.rowconfigure(0, weight=1)
@@ -569,33 +1272,43 @@ class SeleniumOnlyGUI:
         try:
             max_pages = int(self.pages_var.get())
             max_products = int(self.products_var.get())
+            workers = max(1, int(self.workers_var.get()))
         except:
-            messagebox.showerror("错误", "页数和产品数必须是数字")
+            messagebox.showerror("错误", "页数、产品数和浏览器数必须是数字")
             return
         
         if self.is_searching:
             return
         
         self.is_searching = True
+        self.scraper.log_items = self.verbose_var.get()
         self.start_btn.config(state='disabled')
         self.stop_btn.config(state='normal')
+        # 丢弃上一次运行尚未写入的日志，避免混入本次日志
+        try:
+            while True:
+                self.log_queue.get_nowait()
+        except queue.Empty:
+            pass
         self.log_text.delete(1.0, tk.END)
         
         self.search_thread = threading.Thread(
             target=self.search_worker,
-            args=(keyword, max_pages, max_products),
+            args=(keyword, max_pages, max_products, self.sharded_var.get(), workers),
             daemon=True
         )
         self.search_thread.start()
     
-    def search_worker(self, keyword, max_pages, max_products):
+    def search_worker(self, keyword, max_pages, max_products, sharded=False, workers=2):
         try:
             self.scraper.search_products(
                 keyword=keyword,
                 max_pages=max_pages,
                 max_products=max_products,
                 progress_callback=self.log_message,
-                stop_flag=lambda: self.is_searching
+                stop_flag=lambda: self.is_searching,
+                sharded=sharded,
+                workers=workers
             )
         except Exception as e:
             self.log_message(f"❌ 错误: {e}")
@@ -609,15 +1322,44 @@ class SeleniumOnlyGUI:
     
     def search_completed(self):
         self.is_searching = False
+        self.stats_var.set(self._format_stats())
         self.start_btn.config(state='normal')
         self.stop_btn.config(state='disabled')
     
     def log_message(self, message):
-        def add():
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
+        """可在任意线程调用 - 只入队，不触碰Tk"""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        self.log_queue.put(f"[{timestamp}] {message}\n")
+    
+    def _flush_logs(self):
+        """定时批量写入日志，并把日志窗口限制在 LOG_MAX_LINES 行"""
+        lines = []
+        try:
+            while len(lines) < self.LOG_BATCH_SIZE:
+                lines.append(self.log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        
+        if lines:
+            self.log_text.insert(tk.END, ''.join(lines))
+            # 每行以换行结尾，end-1c 位于最后一行之后的空行
+            line_count = int(self.log_text.index('end-1c').split('.')[0]) - 1
+            if line_count > self.LOG_MAX_LINES:
+                self.log_text.delete('1.0', f'{line_count - self.LOG_MAX_LINES + 1}.0')
             self.log_text.see(tk.END)
-        self.root.after(0, add)
+        
+        if self.is_searching:
+            self.stats_var.set(self._format_stats())
+        
+        self.root.after(self.LOG_FLUSH_INTERVAL_MS, self._flush_logs)
+    
+    def _format_stats(self):
+        stats = self.scraper.run_stats
+        products = stats['products']
+        minutes = max(time.time() - stats['started_at'], 1) / 60
+        error_rate = stats['errors'] / products * 100 if products else 0
+        return (f"产品/分钟: {products / minutes:.1f}    产品: {products}    "
+                f"卖家: {stats['sellers']}    错误率: {error_rate:.1f}%")
     
     def open_folder(self):
         import subprocess, platform
@@ -633,9 +1375,28 @@ class SeleniumOnlyGUI:
             messagebox.showerror("错误", f"无法打开: {e}")
 
 
+# 启动耗时基准测试时不应被加载的重型模块（见 benchmark_startup.py）
+STARTUP_HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl', 'selenium', 'undetected_chromedriver')
+
+
+def _report_startup(root, path):
+    """窗口首次显示后写入时间戳和已加载的重型模块，然后退出"""
+    root.update_idletasks()
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({
+            'first_window_at': time.time(),
+            'heavy_modules': [m for m in STARTUP_HEAVY_MODULES if m in sys.modules],
+        }, f)
+    os.replace(path + '.tmp', path)
+    root.destroy()
+
+
 def main():
     root = tk.Tk()
     app = SeleniumOnlyGUI(root)
+    bench_path = os.environ.get('AJS_STARTUP_BENCH')
+    if bench_path:
+        root.after_idle(_report_startup, root, bench_path)
     root.mainloop()
 
 
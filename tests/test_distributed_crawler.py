@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+分布式任务队列行为测试 - SQLite 与 Redis（fakeredis）两种后端
+
+运行: pip install pytest "fakeredis[lua]" && python -m pytest -q tests
+"""
+
+import pytest
+
+from distributed_crawler import RedisTaskQueue, SQLiteTaskQueue, Worker
+
+
+@pytest.fixture(params=['sqlite', 'redis'])
+def queue(request, tmp_path):
+    if request.param == 'sqlite':
+        return SQLiteTaskQueue(str(tmp_path / 'jobs.db'), 'test-job')
+    fakeredis = pytest.importorskip('fakeredis')
+    return RedisTaskQueue(job='test-job', client=fakeredis.FakeRedis(decode_responses=True))
+
+
+def search_task(page):
+    return {'type': 'search', 'keyword': '口红', 'page': page}
+
+
+def asin_task(asin, rank):
+    return {'type': 'asin', 'product': {'asin': asin, 'title': asin}, 'rank': rank}
+
+
+def lease_all(queue, visibility_timeout=300, limit=20):
+    """领取直到队列返回None；limit 防止无限重试的任务让测试挂起"""
+    leased = []
+    while len(leased) < limit:
+        item = queue.lease('worker-1', visibility_timeout)
+        if item is None:
+            break
+        leased.append(item)
+    return leased
+
+
+def test_lease_hands_out_each_task_once(queue):
+    queue.put([search_task(1), search_task(2)])
+
+    leased = lease_all(queue)
+
+    assert sorted(task['page'] for _, task, _, _ in leased) == [1, 2]
+    assert queue.lease('worker-2') is None
+    assert not queue.is_drained()
+
+
+def test_complete_drains_queue(queue):
+    queue.put([search_task(1)])
+    task_id, _, token, _ = queue.lease('worker-1')
+
+    assert queue.complete(task_id, token)
+
+    assert queue.is_drained()
+    assert queue.stats()['done'] == 1
+
+
+def test_expired_lease_is_requeued(queue):
+    queue.put([search_task(1)])
+    first_id, _, _, attempt = queue.lease('worker-1', visibility_timeout=-1)
+
+    second = queue.lease('worker-2')
+
+    assert second is not None
+    assert second[0] == first_id
+    assert second[1]['page'] == 1
+    assert (attempt, second[3]) == (1, 2)
+
+
+def test_expired_leases_count_against_max_attempts(queue):
+    queue.put([search_task(1)])
+
+    leased = lease_all(queue, visibility_timeout=-1)
+
+    assert len(leased) == queue.max_attempts
+    assert queue.stats()['failed'] == 1
+    assert queue.is_drained()
+
+
+def test_fail_requeues_until_max_attempts(queue):
+    queue.put([search_task(1)])
+
+    for attempt in range(queue.max_attempts):
+        leased = queue.lease('worker-1')
+        assert leased is not None, f"attempt {attempt + 1} should be leased"
+        assert queue.fail(leased[0], leased[2], RuntimeError('boom'))
+
+    assert queue.lease('worker-1') is None
+    stats = queue.stats()
+    assert stats['failed'] == 1
+    assert stats['pending'] == 0
+    assert queue.is_drained()
+
+
+def test_stale_worker_cannot_complete_or_fail(queue):
+    queue.put([search_task(1)])
+    task_id, _, stale_token, _ = queue.lease('worker-a', visibility_timeout=-1)
+    _, _, token, _ = queue.lease('worker-b')
+
+    assert not queue.fail(task_id, stale_token, RuntimeError('late'))
+    assert not queue.complete(task_id, stale_token)
+    assert not queue.extend(task_id, stale_token)
+    assert not queue.release(task_id, stale_token)
+    # worker-b 仍持有该任务，其他节点领取不到
+    assert queue.lease('worker-c') is None
+
+    assert queue.complete(task_id, token)
+    assert queue.is_drained()
+
+
+def test_extend_keeps_lease_from_expiring(queue):
+    queue.put([search_task(1)])
+    task_id, _, token, _ = queue.lease('worker-1', visibility_timeout=-1)
+
+    assert queue.extend(task_id, token, visibility_timeout=300)
+
+    assert queue.lease('worker-2') is None
+    assert queue.complete(task_id, token)
+
+
+def test_release_requeues_without_counting_attempt(queue):
+    queue.put([search_task(1)])
+    task_id, _, token, _ = queue.lease('worker-1')
+
+    assert queue.release(task_id, token)
+
+    leased = queue.lease('worker-2')
+    assert leased[0] == task_id
+    assert leased[3] == 1
+    assert not queue.complete(task_id, token)
+
+
+def test_put_dedupes_by_task_key(queue):
+    assert queue.put([search_task(1), search_task(1)]) == 1
+    assert queue.put([search_task(1), search_task(2)]) == 1
+    assert queue.put([asin_task('B001', '0001:000')]) == 1
+    assert queue.put([asin_task('B001', '0002:005')]) == 0
+
+    assert len(lease_all(queue)) == 3
+
+
+def test_put_limit_caps_tasks_of_that_type(queue):
+    queue.put([search_task(1)])
+    added = queue.put([asin_task(f'B00{i}', f'0001:00{i}') for i in range(5)], limit=3)
+
+    assert added == 3
+    assert queue.put([asin_task('B009', '0002:000')], limit=3) == 0
+    # 上限只针对同类型任务
+    assert queue.put([search_task(2)], limit=3) == 1
+
+
+def test_results_are_ordered_by_rank(queue):
+    queue.add_result({'asin': 'B003'}, None, '0002:000')
+    queue.add_result({'asin': 'B001'}, {'seller_name': 'A'}, '0001:001')
+    queue.add_result({'asin': 'B002'}, {'seller_name': 'B'}, '0001:000')
+
+    results = queue.results()
+
+    assert [rank for rank, _, _ in results] == ['0001:000', '0001:001', '0002:000']
+    assert [product['asin'] for _, product, _ in results] == ['B002', 'B001', 'B003']
+    assert results[2][2] is None
+
+
+def test_add_result_is_idempotent_per_asin(queue):
+    queue.add_result({'asin': 'B001'}, None, '0001:000')
+    queue.add_result({'asin': 'B001'}, {'seller_name': 'A'}, '0001:000')
+
+    results = queue.results()
+
+    assert len(results) == 1
+    assert results[0][2] == {'seller_name': 'A'}
+
+
+class FakeScraper:
+    """按预设顺序返回卖家信息（None 表示获取失败），不启动浏览器"""
+
+    def __init__(self, sellers):
+        self.sellers = list(sellers)
+        self.calls = 0
+
+    def _create_driver(self):
+        return object()
+
+    def _get_seller_with_browser(self, driver, product, progress_callback=None, stop_flag=None):
+        self.calls += 1
+        return self.sellers.pop(0)
+
+    def _format_fetch_stats(self):
+        return ''
+
+    @property
+    def profiler(self):
+        return type('Profiler', (), {'fields': {}})()
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    import distributed_crawler
+    monkeypatch.setattr(distributed_crawler.time, 'sleep', lambda seconds: None)
+
+
+def run_worker(queue, scraper):
+    return Worker(queue, scraper, 'worker-1', progress_callback=lambda message: None).run()
+
+
+def test_worker_retries_asin_task_when_seller_lookup_fails(queue, no_sleep):
+    queue.put([asin_task('B001', '0001:000')])
+    scraper = FakeScraper([None, {'seller_name': 'A'}])
+
+    run_worker(queue, scraper)
+
+    assert scraper.calls == 2
+    assert queue.results()[0][2] == {'seller_name': 'A'}
+    assert queue.stats()['done'] == 1
+
+
+def test_worker_keeps_product_row_once_retries_are_used_up(queue, no_sleep):
+    queue.put([asin_task('B001', '0001:000')])
+    scraper = FakeScraper([None] * queue.max_attempts)
+
+    run_worker(queue, scraper)
+
+    assert scraper.calls == queue.max_attempts
+    assert [(product['asin'], seller) for _, product, seller in queue.results()] == [('B001', None)]
+    assert queue.is_drained()
+
+
+def test_worker_renews_lease_and_gives_up_once_it_is_taken(queue):
+    queue.put([search_task(1)])
+    task_id, _, token, _ = queue.lease('worker-a', visibility_timeout=-1)
+    worker = Worker(queue, FakeScraper([]), 'worker-a', progress_callback=lambda message: None)
+    worker.lease = {'id': task_id, 'token': token, 'renewed_at': 0, 'lost': False}
+
+    assert worker._keep_going()
+    assert queue.lease('worker-b') is None
+
+    worker.lease['renewed_at'] = 0
+    queue.extend(task_id, token, visibility_timeout=-1)
+    queue.lease('worker-b')
+
+    assert not worker._keep_going()
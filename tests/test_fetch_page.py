@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+页面加载测试 - 熔断器、验证码检测、退避重试、无结果/无效页面判定
+
+用假浏览器代替 Selenium，WebDriverWait 只检查一次条件，不成立即视为超时。
+
+运行: python -m pytest -q tests
+"""
+
+import pytest
+
+import main_selenium_only
+from main_selenium_only import CircuitBreaker, SeleniumOnlyScraper, is_captcha_page
+
+
+READY = '<html><body><div data-component-type="s-search-result"></div></body></html>'
+EMPTY = '<html><body>「xyz」の検索に一致する商品はありませんでした。</body></html>'
+INVALID = '<html><body>503 Service Unavailable</body></html>'
+CAPTCHA = ('<html><body><form action="/errors/validateCaptcha">'
+           '<input id="captchacharacters"></form></body></html>')
+
+
+class FakeTimeout(Exception):
+    pass
+
+
+class FakeWait:
+    def __init__(self, driver, timeout):
+        self.driver = driver
+
+    def until(self, condition):
+        result = condition(self.driver)
+        if not result:
+            raise FakeTimeout()
+        return result
+
+
+class FakeBy:
+    CSS_SELECTOR = 'css selector'
+
+
+class FakeDriver:
+    """依次返回预设页面；页面为异常对象时 get() 抛出该异常"""
+
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.loads = 0
+        self.page_source = ''
+
+    def get(self, url):
+        self.loads += 1
+        page = self.pages.pop(0) if len(self.pages) > 1 else self.pages[0]
+        if isinstance(page, Exception):
+            raise page
+        self.page_source = page
+
+    def find_elements(self, by, selector):
+        # 标志元素或验证码表单存在时返回非空
+        markers = ('s-search-result', 'validateCaptcha', 'merchant-info')
+        return [object()] if any(marker in self.page_source for marker in markers) else []
+
+
+@pytest.fixture
+def scraper(monkeypatch):
+    monkeypatch.setattr(main_selenium_only, 'WebDriverWait', FakeWait)
+    monkeypatch.setattr(main_selenium_only, 'TimeoutException', FakeTimeout)
+    monkeypatch.setattr(main_selenium_only, 'By', FakeBy)
+    scraper = SeleniumOnlyScraper()
+    scraper.delays = []
+
+    def record_sleep(seconds, stop_flag=None):
+        scraper.delays.append(seconds)
+        return True
+
+    scraper._sleep = record_sleep
+    scraper._reset_fetch_stats()
+    return scraper
+
+
+def fetch(scraper, pages, page_type='search'):
+    driver = FakeDriver(pages)
+    soup, outcome = scraper._fetch_page(driver, 'https://www.amazon.co.jp/s?k=x', page_type)
+    return driver, soup, outcome
+
+
+def test_ready_page_is_ok_and_counts_as_unblocked(scraper):
+    driver, soup, outcome = fetch(scraper, [READY])
+
+    assert outcome == 'ok'
+    assert soup.select('div[data-component-type="s-search-result"]')
+    assert driver.loads == 1
+    assert list(scraper.breaker._outcomes) == [0]
+
+
+def test_no_results_page_is_terminal(scraper):
+    driver, soup, outcome = fetch(scraper, [EMPTY])
+
+    assert outcome == 'empty'
+    assert driver.loads == 1
+    assert scraper.fetch_stats['empty'] == 1
+    assert scraper.fetch_stats['failed'] == 0
+
+
+@pytest.mark.parametrize('page_type', ['search', 'product'])
+def test_invalid_page_is_retried_and_not_counted_as_unblocked(scraper, page_type):
+    driver, soup, outcome = fetch(scraper, [INVALID], page_type)
+
+    assert outcome == 'invalid'
+    assert soup is not None
+    assert driver.loads == scraper.max_retries + 1
+    assert scraper.fetch_stats['invalid'] == scraper.max_retries + 1
+    assert scraper.fetch_stats['failed'] == 1
+    assert len(scraper.breaker._outcomes) == 0
+
+
+def test_transient_invalid_search_page_recovers(scraper):
+    driver, _, outcome = fetch(scraper, [INVALID, READY])
+
+    assert outcome == 'ok'
+    assert driver.loads == 2
+    assert scraper.fetch_stats['retries'] == 1
+
+
+def test_captcha_is_detected_retried_and_counted_as_blocked(scraper):
+    driver, soup, outcome = fetch(scraper, [CAPTCHA])
+
+    assert outcome == 'captcha'
+    assert soup is None
+    assert driver.loads == scraper.max_retries + 1
+    assert scraper.fetch_stats['captcha'] == scraper.max_retries + 1
+    assert list(scraper.breaker._outcomes) == [1] * (scraper.max_retries + 1)
+
+
+def test_browser_error_is_retried(scraper):
+    driver, _, outcome = fetch(scraper, [RuntimeError('tab crashed'), READY])
+
+    assert outcome == 'ok'
+    assert scraper.fetch_stats['error'] == 1
+
+
+def test_backoff_doubles_and_is_capped(scraper):
+    scraper.retry_base_delay = 2.0
+    scraper.retry_max_delay = 5.0
+
+    fetch(scraper, [INVALID])
+
+    assert len(scraper.delays) == scraper.max_retries
+    for delay, base in zip(scraper.delays, [2.0, 4.0, 5.0]):
+        assert base * 0.8 <= delay <= base * 1.2
+
+
+def test_open_breaker_stops_fetch_when_stop_flag_clears(scraper):
+    scraper.breaker._open_until = main_selenium_only.time.time() + 60
+    driver = FakeDriver([READY])
+
+    soup, outcome = scraper._fetch_page(driver, 'https://www.amazon.co.jp/s?k=x', 'search',
+                                        stop_flag=lambda: False)
+
+    assert (soup, outcome) == (None, 'stopped')
+    assert driver.loads == 0
+
+
+def test_captcha_markers():
+    assert is_captcha_page(CAPTCHA)
+    assert is_captcha_page('<p>申し訳ありませんが、お客様がロボットでないことを確認させていただく必要があります</p>')
+    assert not is_captcha_page(READY)
+
+
+def test_breaker_waits_for_min_samples():
+    breaker = CircuitBreaker(threshold=0.5, min_samples=5, cooldown=60)
+
+    assert [breaker.record(True) for _ in range(4)] == [0, 0, 0, 0]
+    assert breaker.record(True) == 60
+    assert breaker.trips == 1
+    assert breaker.remaining() > 0
+
+
+def test_breaker_stays_closed_below_threshold():
+    breaker = CircuitBreaker(threshold=0.5, min_samples=4)
+
+    for blocked in [True, False, False, False, True, False]:
+        assert breaker.record(blocked) == 0
+    assert breaker.trips == 0
+
+
+def test_breaker_cooldown_doubles_up_to_max_and_resets():
+    breaker = CircuitBreaker(threshold=0.5, min_samples=2, cooldown=60, max_cooldown=200)
+
+    def trip():
+        breaker._open_until = 0
+        breaker.record(True)
+        return breaker.record(True)
+
+    assert [trip(), trip(), trip()] == [60, 120, 200]
+
+    # 封锁率回落到阈值以下后，下一次熔断从 cooldown 重新开始
+    breaker._open_until = 0
+    breaker.record(False)
+    breaker.record(False)
+    assert trip() == 60
+
+
+def test_breaker_does_not_retrip_while_open():
+    breaker = CircuitBreaker(threshold=0.5, min_samples=2, cooldown=60)
+    breaker.record(True)
+    assert breaker.record(True) == 60
+
+    breaker.record(True)
+    assert breaker.record(True) == 0
+    assert breaker.trips == 1
+
+
+def test_breaker_wait_returns_false_when_stopped():
+    breaker = CircuitBreaker()
+    assert breaker.wait(lambda: False)
+
+    breaker._open_until = main_selenium_only.time.time() + 60
+    assert not breaker.wait(lambda: False)
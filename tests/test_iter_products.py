@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+流式接口测试 - iter_products / aiter_products
+
+用假浏览器和预设搜索结果代替 Selenium，检查逐个产出、提前停止时关闭浏览器、异步版本正常退出。
+
+运行: python -m pytest -q tests
+"""
+
+import asyncio
+
+import pytest
+
+import main_selenium_only
+from main_selenium_only import SeleniumOnlyScraper
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_calls = 0
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+class FakeScraper(SeleniumOnlyScraper):
+    """pages: {页码: 产品列表 / None(加载失败)}，记录搜索页和卖家页请求"""
+
+    def __init__(self, pages):
+        super().__init__()
+        self.pages = pages
+        self.drivers = []
+        self.searched = []
+        self.sellers_fetched = []
+
+    def _create_driver(self):
+        driver = FakeDriver()
+        self.drivers.append(driver)
+        return driver
+
+    def _search_page(self, driver, keyword, page, progress_callback=None, stop_flag=None, params=None):
+        self.searched.append(page)
+        return self.pages.get(page, [])
+
+    def _get_seller_with_browser(self, driver, product, progress_callback=None, stop_flag=None):
+        self.sellers_fetched.append(product['asin'])
+        return {'seller_name': f"seller-{product['asin']}"}
+
+
+def products(page, n):
+    return [{'asin': f'P{page}-{i}', 'title': f'product {page}-{i}', 'url': f'/dp/P{page}-{i}'}
+            for i in range(n)]
+
+
+@pytest.fixture(autouse=True)
+def fast(monkeypatch):
+    monkeypatch.setattr(main_selenium_only, 'load_selenium', lambda: True)
+    monkeypatch.setattr(main_selenium_only.time, 'sleep', lambda seconds: None)
+
+
+def test_products_are_fetched_one_at_a_time():
+    scraper = FakeScraper({1: products(1, 3)})
+    items = scraper.iter_products('口红', max_pages=1, max_products=10)
+
+    product, seller = next(items)
+
+    assert product['asin'] == 'P1-0'
+    assert seller == {'seller_name': 'seller-P1-0'}
+    # 调用方还没取下一个，不会提前抓取
+    assert scraper.sellers_fetched == ['P1-0']
+    assert scraper.is_searching
+    items.close()
+
+
+def test_early_break_quits_driver_and_resets_state():
+    scraper = FakeScraper({1: products(1, 5)})
+
+    for _ in scraper.iter_products('口红', max_pages=1, max_products=10):
+        break
+
+    assert scraper.drivers[0].quit_calls == 1
+    assert not scraper.is_searching
+    assert scraper.sellers_fetched == ['P1-0']
+
+
+def test_close_quits_driver_and_resets_state():
+    scraper = FakeScraper({1: products(1, 5)})
+    items = scraper.iter_products('口红', max_pages=1, max_products=10)
+    next(items)
+    next(items)
+
+    items.close()
+
+    assert scraper.drivers[0].quit_calls == 1
+    assert not scraper.is_searching
+
+
+def test_stops_at_max_products_across_pages():
+    scraper = FakeScraper({1: products(1, 3), 2: products(2, 3)})
+
+    results = list(scraper.iter_products('口红', max_pages=5, max_products=4))
+
+    assert [product['asin'] for product, _ in results] == ['P1-0', 'P1-1', 'P1-2', 'P2-0']
+    assert scraper.searched == [1, 2]
+    assert scraper.run_stats['products'] == 4
+    assert scraper.drivers[0].quit_calls == 1
+
+
+def test_empty_page_ends_the_search():
+    scraper = FakeScraper({1: products(1, 2), 2: []})
+
+    results = list(scraper.iter_products('口红', max_pages=5, max_products=100))
+
+    assert len(results) == 2
+    assert scraper.searched == [1, 2]
+
+
+def test_failed_page_is_skipped():
+    scraper = FakeScraper({1: None, 2: products(2, 2)})
+
+    results = list(scraper.iter_products('口红', max_pages=2, max_products=100))
+
+    assert [product['asin'] for product, _ in results] == ['P2-0', 'P2-1']
+
+
+def test_stop_flag_ends_iteration():
+    scraper = FakeScraper({1: products(1, 5)})
+    running = [True]
+    results = []
+
+    for item in scraper.iter_products('口红', max_pages=1, max_products=10, stop_flag=lambda: running[0]):
+        results.append(item)
+        if len(results) == 2:
+            running[0] = False
+
+    assert len(results) == 2
+    assert scraper.drivers[0].quit_calls == 1
+    assert not scraper.is_searching
+
+
+def test_aiter_products_yields_everything():
+    scraper = FakeScraper({1: products(1, 3)})
+
+    async def collect():
+        return [item async for item in scraper.aiter_products('口红', max_pages=1, max_products=10)]
+
+    results = asyncio.run(collect())
+
+    assert [product['asin'] for product, _ in results] == ['P1-0', 'P1-1', 'P1-2']
+    assert scraper.drivers[0].quit_calls == 1
+    assert not scraper.is_searching
+
+
+def test_aiter_products_early_exit_quits_driver():
+    scraper = FakeScraper({1: products(1, 5)})
+
+    async def take_one():
+        items = scraper.aiter_products('口红', max_pages=1, max_products=10)
+        try:
+            async for item in items:
+                return item
+        finally:
+            await items.aclose()
+
+    product, _ = asyncio.run(take_one())
+
+    assert product['asin'] == 'P1-0'
+    assert scraper.sellers_fetched == ['P1-0']
+    assert scraper.drivers[0].quit_calls == 1
+    assert not scraper.is_searching
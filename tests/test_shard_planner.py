@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+分片规划与分片并行搜索测试 - 不启动浏览器，用构造的搜索结果页代替
+
+运行: python -m pytest -q tests
+"""
+
+import pytest
+from bs4 import BeautifulSoup
+
+import main_selenium_only
+from main_selenium_only import SeleniumOnlyScraper, ShardPlanner
+
+
+def search_html(count=None, per_page=48, pages=None, categories=(), prices=(), asins=None):
+    """构造一页搜索结果"""
+    parts = []
+    if count is not None:
+        parts.append(f'<span data-component-type="s-result-info-bar">'
+                     f'1-{per_page}/{count:,}以上の結果 「口红」</span>')
+    parts.append('<div id="departments">')
+    parts += [f'<a href="/s?k=x&rh=n%3A{node}">{name}</a>' for node, name in categories]
+    parts.append('</div><div id="priceRefinements">')
+    parts += [f'<a href="/s?k=x&rh=p_36%3A{value}">{label}</a>' for value, label in prices]
+    parts.append('</div>')
+    if pages:
+        parts.append(f'<span class="s-pagination-item">{pages}</span>')
+    asins = asins if asins is not None else [f'B{i:09d}' for i in range(per_page)]
+    parts += [f'<div data-component-type="s-search-result" data-asin="{asin}"></div>' for asin in asins]
+    return '<html><body>' + ''.join(parts) + '</body></html>'
+
+
+def soup_of(html):
+    return BeautifulSoup(html, 'html.parser')
+
+
+CATEGORIES = [('100', 'コスメ'), ('200', 'ドラッグストア')]
+PRICES = [('-1000', '￥1,000以下'), ('1000-2500', '￥1,000～￥2,500'), ('2500-', '￥2,500以上')]
+
+
+def test_shard_within_page_cap_is_not_split():
+    planner = ShardPlanner()
+    soup = soup_of(search_html(count=200, categories=CATEGORIES, prices=PRICES))
+
+    assert planner.split(planner.root(), soup, max_pages=5) == (None, [])
+
+
+def test_unknown_result_count_falls_back_to_pagination():
+    planner = ShardPlanner()
+
+    assert not planner.exceeds(soup_of(search_html()), max_pages=5)
+    assert not planner.exceeds(soup_of(search_html(pages=5)), max_pages=5)
+    assert planner.exceeds(soup_of(search_html(pages=7)), max_pages=5)
+
+
+def test_large_root_is_split_by_category_first():
+    planner = ShardPlanner()
+    soup = soup_of(search_html(count=3000, categories=CATEGORIES, prices=PRICES))
+
+    facet, children = planner.split(planner.root(), soup, max_pages=5)
+
+    assert facet == 'category'
+    assert [child['params'] for child in children] == [{'rh': 'n:100'}, {'rh': 'n:200'}]
+    assert [child['label'] for child in children] == ['コスメ', 'ドラッグストア']
+
+
+def test_category_shard_is_split_by_discovered_price_ranges():
+    planner = ShardPlanner()
+    root = planner.root()
+    _, categories = planner.split(root, soup_of(search_html(count=3000, categories=CATEGORIES)), 5)
+
+    facet, children = planner.split(categories[0], soup_of(search_html(count=3000, prices=PRICES)), 5)
+
+    assert facet == 'price'
+    assert [child['params']['rh'] for child in children] == [
+        'n:100,p_36:-1000', 'n:100,p_36:1000-2500', 'n:100,p_36:2500-']
+    assert children[1]['label'] == 'コスメ / ￥1,000～￥2,500'
+
+
+def test_fixed_price_ranges_are_used_without_refinement_links():
+    planner = ShardPlanner()
+
+    facet, children = planner.split(planner.root(), soup_of(search_html(count=3000)), 5)
+
+    assert facet == 'price'
+    assert len(children) == len(ShardPlanner.PRICE_RANGES)
+    assert children[0]['params'] == {'rh': 'p_36:-1000'}
+
+
+def test_price_shard_is_split_by_sort_order_without_default():
+    planner = ShardPlanner()
+    _, prices = planner.split(planner.root(), soup_of(search_html(count=3000, prices=PRICES)), 5)
+
+    facet, children = planner.split(prices[0], soup_of(search_html(count=3000)), 5)
+
+    assert facet == 'sort'
+    assert [child['params']['s'] for child in children] == [
+        'price-asc-rank', 'price-desc-rank', 'review-rank']
+    assert all(child['params']['rh'] == 'p_36:-1000' for child in children)
+    # 排序分片不再细分
+    assert planner.split(children[0], soup_of(search_html(count=3000)), 5) == (None, [])
+
+
+def test_more_departments_than_max_categories_splits_by_price_instead():
+    planner = ShardPlanner(max_categories=3)
+    departments = [(str(node), f'cat{node}') for node in range(5)]
+    soup = soup_of(search_html(count=3000, categories=departments, prices=PRICES))
+
+    facet, children = planner.split(planner.root(), soup, max_pages=5)
+
+    # 只按前3个类目拆分会丢掉其余类目的结果
+    assert facet == 'price'
+    assert [child['params']['rh'] for child in children] == [
+        'p_36:-1000', 'p_36:1000-2500', 'p_36:2500-']
+
+
+def test_price_ranges_that_leave_gaps_fall_back_to_fixed_ranges():
+    planner = ShardPlanner()
+
+    assert planner.covers_all_prices(PRICES)
+    assert not planner.covers_all_prices(PRICES[:2])
+    assert not planner.covers_all_prices(PRICES[1:])
+    assert not planner.covers_all_prices([('-1000', 'a'), ('2000-', 'b')])
+
+    soup = soup_of(search_html(count=3000, prices=PRICES[:2]))
+    _, children = planner.split(planner.root(), soup, 5)
+    assert len(children) == len(ShardPlanner.PRICE_RANGES)
+
+
+class FakeScraper(SeleniumOnlyScraper):
+    """按分片URL参数返回构造页面，记录每次搜索页加载"""
+
+    def __init__(self, pages):
+        super().__init__()
+        self.pages = pages
+        self.loads = []
+
+    def _create_driver(self):
+        return None
+
+    def _load_search_page(self, driver, keyword, page, progress_callback=None, stop_flag=None, params=None):
+        key = (tuple(sorted((params or {}).items())), page)
+        self.loads.append(key)
+        html = self.pages.get(key)
+        if html is None:
+            return None, []
+        soup = soup_of(html)
+        products = [{'asin': item['data-asin'], 'title': item['data-asin'], 'url': item['data-asin']}
+                    for item in soup.select('div[data-component-type="s-search-result"]')]
+        return soup, products
+
+    def _get_seller_with_browser(self, driver, product, progress_callback=None, stop_flag=None):
+        return {'seller_name': 'S'}
+
+
+@pytest.fixture
+def fast(monkeypatch):
+    monkeypatch.setattr(main_selenium_only, 'load_selenium', lambda: True)
+    monkeypatch.setattr(main_selenium_only.time, 'sleep', lambda seconds: None)
+
+
+def asins(prefix, n):
+    return [f'{prefix}{i:03d}' for i in range(n)]
+
+
+def test_sharded_search_only_splits_oversized_shards(fast):
+    pages = {
+        ((), 1): search_html(count=3000, per_page=2, categories=CATEGORIES, asins=asins('R', 2)),
+        ((('rh', 'n:100'),), 1): search_html(count=3, per_page=2, asins=asins('A', 2)),
+        ((('rh', 'n:100'),), 2): search_html(count=3, per_page=1, asins=asins('A', 3)[2:]),
+        ((('rh', 'n:200'),), 1): search_html(count=2, per_page=2, asins=asins('B', 2)),
+    }
+    scraper = FakeScraper(pages)
+
+    results = list(scraper.iter_products_sharded('口红', max_pages=2, max_products=100, workers=2))
+
+    assert sorted(product['asin'] for product, _ in results) == asins('A', 3) + asins('B', 2)
+    # 根分片拆分后不再翻页；每个类目分片都在页数上限内，不再细分
+    assert ((), 2) not in scraper.loads
+    assert not any(dict(params).get('s') or 'p_36' in dict(params).get('rh', '')
+                   for params, _ in scraper.loads)
+
+
+def test_sharded_search_stops_pulling_shards_at_max_products(fast):
+    categories = [(str(node), f'cat{node}') for node in range(8)]
+    pages = {((), 1): search_html(count=3000, per_page=2, categories=categories, asins=asins('R', 2))}
+    for node, _ in categories:
+        pages[((('rh', f'n:{node}'),), 1)] = search_html(count=2, per_page=2, asins=asins(f'C{node}-', 2))
+    scraper = FakeScraper(pages)
+
+    results = list(scraper.iter_products_sharded('口红', max_pages=1, max_products=3, workers=1))
+
+    assert len(results) == 3
+    # 第二个类目分片凑满3个后，剩余分片不再加载
+    assert len(scraper.loads) == 3
+
+
+class FlakyDriverScraper(FakeScraper):
+    """第一次启动浏览器失败"""
+
+    def __init__(self, pages):
+        super().__init__(pages)
+        self.driver_starts = 0
+
+    def _create_driver(self):
+        self.driver_starts += 1
+        if self.driver_starts == 1:
+            raise RuntimeError('chrome failed to start')
+        return object()
+
+
+def test_shard_is_requeued_when_browser_fails_to_start(fast):
+    pages = {((), 1): search_html(count=2, per_page=2, asins=asins('R', 2))}
+    scraper = FlakyDriverScraper(pages)
+    messages = []
+
+    results = list(scraper.iter_products_sharded('口红', max_pages=1, max_products=10, workers=1,
+                                                 progress_callback=messages.append))
+
+    assert [product['asin'] for product, _ in results] == asins('R', 2)
+    assert scraper.driver_starts == 2
+    assert any('重新排队' in message for message in messages)
+
+
+class NoChromeScraper(FakeScraper):
+    def _create_driver(self):
+        raise RuntimeError('no chrome')
+
+
+def test_shard_is_given_up_after_repeated_failures(fast):
+    scraper = NoChromeScraper({})
+    messages = []
+
+    results = list(scraper.iter_products_sharded('口红', max_pages=1, max_products=10, workers=2,
+                                                 progress_callback=messages.append))
+
+    assert results == []
+    assert sum('重新排队' in message for message in messages) == scraper.shard_max_attempts - 1
+    assert any('已放弃' in message for message in messages)